@@ -1,8 +1,16 @@
 import streamlit as st
 import pandas as pd
-import altair as alt
+import uuid
 from datetime import datetime
 from typing import Tuple
+import data_loader
+import metrics_engine
+import trade_store
+import view_cache
+import chart_builder
+import synthetic_data
+import profiling
+import correlation
 
 # 가정: data_handler.py는 별도의 파일로 존재하며 필요한 함수들을 포함합니다.
 # 이 파일을 실행하려면 data_handler.py가 필요합니다.
@@ -12,35 +20,22 @@ from typing import Tuple
 # [수정] 데이터 로딩과 처리를 분리하여, 여기서는 원본 데이터만 생성합니다.
 class DataHandlerMock:
     def load_trade_data(self):
-        # 샘플 데이터 생성
-        dates = pd.to_datetime(pd.date_range(start='2014-01-01', end='2024-05-01', freq='MS'))
-        data = []
-        for country in ['총합', '미국', '중국']:
-            for date in dates:
-                export = 1e9 * (50 + 10 * (1 + 0.5 * abs((date.month - 6.5)))) + (hash(country) % 10) * 1e8
-                imports = 1e9 * (45 + 8 * (1 + 0.4 * abs((date.month - 6.5)))) + (hash(country) % 8) * 1e8
-                
-                export *= (1 + (pd.Timestamp.now().microsecond % 1000) / 10000 - 0.05)
-                imports *= (1 + (pd.Timestamp.now().microsecond % 1000) / 10000 - 0.05)
-                
-                data.append({
-                    'Date': date, 
-                    'country_name': country,
-                    'export_amount': export,
-                    'import_amount': imports,
-                })
-
-        df = pd.DataFrame(data)
-        df['trade_balance'] = df['export_amount'] - df['import_amount']
-        return df
+        # [수정] 시드 기반 벡터화 생성기로 샘플 데이터를 만들어, 실행할 때마다 같은 값이 나옵니다.
+        df = synthetic_data.make_trade_data(n_countries=3, n_months=125, start='2014-01-01')
+        # [수정] 실제 data_handler와 같이 파생 지표까지 계산된 데이터를 반환합니다.
+        return metrics_engine.add_derived_metrics(df)
 
     def get_and_update_kospi_data(self):
         # 샘플 KOSPI 데이터 생성
-        dates = pd.to_datetime(pd.date_range(start='2014-01-01', end='2024-05-01', freq='MS'))
-        kospi_price = [200 + i*0.5 + 20 * (1 + 0.6 * abs((d.month - 6.5))) for i, d in enumerate(dates)]
-        kospi_df = pd.DataFrame({'Date': dates, 'Close': kospi_price})
+        kospi_df = synthetic_data.make_kospi_data(start='2014-01-01', end='2024-05-01', freq='MS')
         return kospi_df, "KOSPI 200 데이터를 성공적으로 불러왔습니다."
 
+    def trade_data_version(self):
+        return 0
+
+    def kospi_data_version(self):
+        return 0
+
     def process_kospi_for_chart(self, kospi_data):
         kospi_data['kospi_price'] = kospi_data['Close']
         return kospi_data[['Date', 'kospi_price']]
@@ -50,11 +45,15 @@ data_handler = DataHandlerMock()
 
 
 # --- 상수 정의 ---
-PRIMARY_COLOR = "#0d6efd"
-SECONDARY_COLOR = "#dc3545"
-TERTIARY_COLOR = "#198754"
-KOSPI_COLOR = "#FF9900"
-COUNTRY_OPTIONS = ['총합', '미국', '중국']
+CHART_MAX_POINTS = 600  # 시계열별 최대 전송 점 개수 (None이면 다운샘플링하지 않음)
+TRADE_FLOAT32 = False  # True이면 무역 금액·지표 열을 float32로 보관해 메모리를 줄입니다
+TOP_MOVERS = 10  # 주요 변동 국가 표에 보여줄 상승/하락 국가 수
+HEATMAP_COUNTRIES = 30  # 상관관계 히트맵에 기본으로 보여줄 국가 수
+LOAD_TIMEOUT = 10.0  # 재실행 한 번에서 데이터 로딩을 기다리는 최대 시간(초). 넘으면 먼저 그리고 나중에 채웁니다.
+LOAD_POLL_SECONDS = 1.0  # 로딩이 끝났는지 확인하는 주기(초)
+# 재실행 중 위젯이 그려지지 않아도(예: 데이터 로딩 대기) 값이 지워지지 않아야 하는 위젯 키
+WIDGET_KEYS = ['selected_country', 'data_form', 'unit_form', 'start_date_input', 'end_date_input',
+               'movers_metric', 'movers_basis', 'corr_metric', 'corr_countries']
 
 class Dashboard:
     """
@@ -64,42 +63,130 @@ class Dashboard:
 
     def __init__(self):
         st.set_page_config(layout="wide", page_title="무역 & KOSPI 대시보드", page_icon="📊")
-        if 'init_done' not in st.session_state:
-            self._initialize_session_state()
+        self._initialize_session_state()
+        # [수정] ?debug=1은 환경 변수(DASHBOARD_PROFILE=allow)로 허용한 경우에만 프로파일링을 켭니다.
+        enabled = profiling.enabled_by_env() or (profiling.query_allowed_by_env() and st.query_params.get('debug') == '1')
+        self._profile = profiling.RunProfile(st.session_state.session_id, enabled=enabled)
 
     def _initialize_session_state(self):
-        """세션 상태를 초기화합니다."""
-        st.session_state.selected_country = '총합'
-        st.session_state.is_12m_trailing = True
-        st.session_state.show_yoy_growth = False
-        st.session_state.selected_period = '10년'
-        st.session_state.init_done = True
-
-    @st.cache_data
-    def _load_and_prepare_data(_self) -> Tuple[pd.DataFrame, pd.DataFrame, str]:
         """
-        데이터를 로드하고 기본 전처리를 수행합니다.
-        Streamlit 캐시를 사용하여 반복적인 로딩을 방지합니다.
+        세션 상태를 초기화합니다.
+        [수정] 매 재실행마다 호출해 빠진 키만 기본값으로 채우고, 위젯 값은 일반 세션 값으로 다시 써 둡니다.
+        Streamlit은 한 번의 재실행에서 그려지지 않은 위젯의 값을 지우므로, 로딩 대기 중에도 선택이 유지되도록 합니다.
+        """
+        state = st.session_state
+        state.setdefault('is_12m_trailing', True)
+        state.setdefault('show_yoy_growth', False)
+        defaults = {
+            'selected_country': '총합',
+            'selected_period': '10년',
+            'data_form': '12개월 누적' if state.is_12m_trailing else '월별',
+            'unit_form': 'YoY' if state.show_yoy_growth else '금액',
+            'session_id': uuid.uuid4().hex[:12],
+        }
+        for key, value in defaults.items():
+            state.setdefault(key, value)
+        for key in WIDGET_KEYS:
+            if key in state:
+                state[key] = state[key]
+
+    @st.cache_resource(max_entries=1)
+    def _start_trade_load(_self, trade_version) -> data_loader.BackgroundTask:
+        """
+        무역 데이터(파생 지표 포함) 로딩을 백그라운드에서 시작합니다.
+        [수정] 재실행마다 pickle 복사본을 만드는 cache_data 대신 cache_resource로 같은 객체를 공유합니다.
+        스냅샷에서 메모리 매핑한 데이터도 복사되지 않습니다.
+        [수정] 무역 데이터와 KOSPI 데이터는 서로 독립적이므로 따로 동시에 읽습니다.
+        [수정] 무역 데이터 버전(원본 변경 시각·크기)을 캐시 키로 받아, 실행 중인 프로세스도 원본이 바뀌면 다시 읽습니다.
+        """
+        _self._profile.cache('load', hit=False)
+        return data_loader.BackgroundTask(data_handler.load_trade_data)
+
+    @st.cache_resource(max_entries=1)
+    def _start_kospi_load(_self, kospi_version: int) -> data_loader.BackgroundTask:
+        """
+        KOSPI 데이터 로딩·전처리를 백그라운드에서 시작합니다. 결과는 (차트용 월별 데이터 또는 None, 메시지)입니다.
+        [수정] KOSPI 데이터 버전을 캐시 키로 받아, 백그라운드 갱신이 끝나면 새 데이터를 반영합니다.
+        """
+        return data_loader.BackgroundTask(_prepare_kospi_data)
+
+    def _trade_data(self, trade_version) -> pd.DataFrame:
+        return self._start_trade_load(trade_version).result()
+
+    def _kospi_data(self, kospi_version: int) -> Tuple[pd.DataFrame, str]:
+        return self._start_kospi_load(kospi_version).result()
+
+    @st.cache_resource(max_entries=1)
+    def _get_dataset(_self, trade_version) -> trade_store.TradeDataset:
+        """국가별 행 범위 색인을 갖춘 무역 데이터셋을 반환합니다 (KOSPI 없이도 사용할 수 있음)."""
+        return trade_store.TradeDataset(_self._trade_data(trade_version), float32=TRADE_FLOAT32)
+
+    @st.cache_resource(max_entries=1)
+    def _get_view_cache(_self, trade_version, kospi_version: int) -> view_cache.ViewCache:
+        """
+        (국가, 누적 여부, YoY 여부)별로 병합·정렬까지 마친 보기 데이터를 보관하는 LRU 캐시를 반환합니다.
+        모든 세션이 공유하며, 무역·KOSPI 데이터 버전 중 하나라도 바뀌면 새로 생성됩니다.
+        """
+        kospi_data, _ = _self._kospi_data(kospi_version)
+        return view_cache.ViewCache(_self._get_dataset(trade_version), kospi_data)
+
+    @st.cache_resource(max_entries=1)
+    def _get_spec_cache(_self, trade_version, kospi_version: int) -> chart_builder.SpecCache:
+        """보기 상태별로 직렬화된 차트 스펙을 보관하는 캐시를 반환합니다."""
+        return chart_builder.SpecCache()
+
+    @st.cache_resource(max_entries=1)
+    def _get_metrics_index(_self, trade_version) -> metrics_engine.MetricsIndex:
+        """
+        모든 국가의 최신 월 값과 전월·전년 대비 증감을 데이터 버전당 한 번만 계산해 둔 색인을 반환합니다.
+        재실행마다 메트릭 카드와 주요 변동 국가 표는 이 색인을 조회만 합니다.
+        """
+        return metrics_engine.MetricsIndex(_self._trade_data(trade_version))
+
+    @st.cache_resource(max_entries=1)
+    def _get_correlations(_self, trade_version, kospi_version: int) -> correlation.LeadLagCorrelation:
+        """
+        모든 국가 × 파생 지표 × 시차(±24개월)의 무역–KOSPI 상관계수를 데이터 버전당 한 번 계산해 둡니다.
+        """
+        kospi_data, _ = _self._kospi_data(kospi_version)
+        return correlation.LeadLagCorrelation(_self._trade_data(trade_version), kospi_data)
+
+    def _scan_latest_metrics(self, df: pd.DataFrame):
+        """
+        색인을 쓸 수 없는 기간(최신 월이나 그 전년 동월이 기간 밖)일 때, 기간 안의 데이터에서 최신 월 지표를 찾습니다.
+        반환 형식은 MetricsIndex.get()과 같고, 데이터가 없으면 None입니다.
         """
-        trade_data = data_handler.load_trade_data()
-        kospi_data, kospi_msg = data_handler.get_and_update_kospi_data()
-        if trade_data is None or kospi_data is None:
-            return None, None, kospi_msg
-        kospi_processed = data_handler.process_kospi_for_chart(kospi_data)
-        return trade_data, kospi_processed, kospi_msg
-
-    def _render_header_and_metrics(self, df: pd.DataFrame):
-        """페이지 제목과 주요 메트릭 카드를 렌더링합니다."""
-        st.title('무역 데이터 & KOSPI 200 대시보드')
-        
         latest_trade_date = df.dropna(subset=['export_amount'])['Date'].max()
         if pd.isna(latest_trade_date):
-            st.warning("선택된 기간에 표시할 무역 데이터가 없습니다.")
-            return
+            return None
 
         latest_data = df[df['Date'] == latest_trade_date]
         prev_month_data = df[df['Date'] == (latest_trade_date - pd.DateOffset(months=1))]
         prev_year_data = df[df['Date'] == (latest_trade_date - pd.DateOffset(years=1))]
+
+        record = {'Date': latest_trade_date}
+        for col_name in trade_store.AMOUNT_COLUMNS:
+            current_val = latest_data[col_name].iloc[0] if not latest_data.empty else 0
+            prev_month_val = prev_month_data[col_name].iloc[0] if not prev_month_data.empty else 0
+            prev_year_val = prev_year_data[col_name].iloc[0] if not prev_year_data.empty else 0
+            record[col_name] = current_val
+            record[f"{col_name}_mom"] = metrics_engine.pct_delta(current_val, prev_month_val)
+            record[f"{col_name}_yoy"] = metrics_engine.pct_delta(current_val, prev_year_val)
+        return record
+
+    def _render_header_and_metrics(self, df: pd.DataFrame, latest: dict = None):
+        """
+        페이지 제목과 주요 메트릭 카드를 렌더링합니다.
+        [수정] latest(색인에서 조회한 최신 월 지표)가 주어지면 데이터 스캔 없이 바로 사용합니다.
+        """
+        st.title('무역 데이터 & KOSPI 200 대시보드')
+        
+        if latest is None:
+            latest = self._scan_latest_metrics(df)
+        if latest is None:
+            st.warning("선택된 기간에 표시할 무역 데이터가 없습니다.")
+            return
+        latest_trade_date = latest['Date']
         
         metrics_map = {'수출액': 'export_amount', '수입액': 'import_amount', '무역수지': 'trade_balance'}
         cols = st.columns(len(metrics_map))
@@ -107,12 +194,10 @@ class Dashboard:
         for i, (label, col_name) in enumerate(metrics_map.items()):
             with cols[i]:
                 with st.container(border=True):
-                    current_val = latest_data[col_name].iloc[0] if not latest_data.empty else 0
-                    prev_month_val = prev_month_data[col_name].iloc[0] if not prev_month_data.empty else 0
-                    prev_year_val = prev_year_data[col_name].iloc[0] if not prev_year_data.empty else 0
-                    
-                    mom_delta = ((current_val - prev_month_val) / abs(prev_month_val)) * 100 if prev_month_val != 0 else 0
-                    yoy_delta = ((current_val - prev_year_val) / abs(prev_year_val)) * 100 if prev_year_val != 0 else 0
+                    current_val = latest[col_name]
+                    # 비교 대상이 없거나 0이면 0%로 표시합니다.
+                    mom_delta = 0 if pd.isna(latest[f"{col_name}_mom"]) else latest[f"{col_name}_mom"]
+                    yoy_delta = 0 if pd.isna(latest[f"{col_name}_yoy"]) else latest[f"{col_name}_yoy"]
 
                     st.metric(label=f"{latest_trade_date.strftime('%Y년 %m월')} {label}", value=f"${current_val/1e9:.2f}B")
                     st.markdown(f"""
@@ -122,95 +207,121 @@ class Dashboard:
                     </div>
                     """, unsafe_allow_html=True)
 
-    def _render_charts(self, df: pd.DataFrame):
-        """상호작용 기능이 포함된 Altair 차트를 생성하고 렌더링합니다."""
-        nearest = alt.selection_point(on='mouseover', encodings=['x'], nearest=True, empty=False)
-        
-        base_cols = ['export_amount', 'import_amount', 'trade_balance']
-        trailing = '_trailing_12m' if st.session_state.is_12m_trailing else ''
-        growth = '_yoy_growth' if st.session_state.show_yoy_growth else ''
-        cols_to_use = [f"{col}{trailing}{growth}" for col in base_cols]
-        export_col, import_col, balance_col = cols_to_use
-
-        vertical_rule = alt.Chart(df).mark_rule(color='gray', strokeDash=[3,3]).encode(
-            x='Date:T',
-            tooltip=[
-                alt.Tooltip('Date:T', title='날짜', format='%Y-%m'),
-                alt.Tooltip('kospi_price:Q', title='KOSPI 200', format=',.2f'),
-                alt.Tooltip(export_col, title="수출", format='$,.2f'),
-                alt.Tooltip(import_col, title="수입", format='$,.2f'),
-                alt.Tooltip(balance_col, title="무역수지", format='$,.2f'),
-            ]
-        ).transform_filter(nearest)
-        
-        base_chart = alt.Chart(df).add_params(nearest)
-        
-        kospi_horizontal_rule = alt.Chart(df).mark_rule(color=KOSPI_COLOR, strokeDash=[3,3]).encode(
-            y=alt.Y('kospi_price:Q')
-        ).transform_filter(nearest)
-        
-        kospi_chart_base = base_chart.mark_line(color=KOSPI_COLOR).encode(
-            x=alt.X('Date:T', title=None, axis=None),
-            y=alt.Y('kospi_price:Q', title='KOSPI 200', scale=alt.Scale(zero=False), axis=alt.Axis(tickCount=4, grid=False))
-        )
-        kospi_points = kospi_chart_base.mark_circle(size=60).encode(
-            opacity=alt.condition(nearest, alt.value(1), alt.value(0))
-        )
-        kospi_chart = alt.layer(kospi_chart_base, kospi_points, kospi_horizontal_rule, vertical_rule).properties(
-            height=110, title=alt.TitleParams("KOSPI 200 지수", anchor='start', fontSize=16)
-        )
-        
-        trade_df = df.dropna(subset=cols_to_use).melt(id_vars=['Date'], value_vars=cols_to_use, var_name='지표', value_name='값')
-        col_map = {export_col: '수출', import_col: '수입', balance_col: '무역수지'}
-        trade_df['지표'] = trade_df['지표'].map(col_map)
-        
-        y_axis_format = "format(datum.value / 1e9, '.0f') + 'B'" if not growth else "format(datum.value, '.1f') + '%'"
-        
-        trade_base_chart = alt.Chart(trade_df).add_params(nearest).encode(
-            x=alt.X('Date:T', title=None, axis=alt.Axis(format='%Y-%m', labelAngle=-45)),
-            color=alt.Color('지표:N', scale=alt.Scale(domain=['수출', '수입', '무역수지'], range=[PRIMARY_COLOR, SECONDARY_COLOR, TERTIARY_COLOR]), legend=alt.Legend(title="구분", orient='top-left'))
-        )
-        
-        line_chart = trade_base_chart.transform_filter(alt.datum.지표 != '무역수지').mark_line(strokeWidth=2.5).encode(
-            y=alt.Y('값:Q', title="금액 (수출입)", scale=alt.Scale(zero=False), axis=alt.Axis(labelExpr=y_axis_format))
-        )
-        area_chart = trade_base_chart.transform_filter(alt.datum.지표 == '무역수지').mark_area(opacity=0.4, line={'color': TERTIARY_COLOR}).encode(
-            y=alt.Y('값:Q', title="금액 (무역수지)", scale=alt.Scale(zero=True), axis=alt.Axis(labelExpr=y_axis_format))
-        )
-        trade_points = trade_base_chart.mark_circle(size=60).encode(
-            y='값:Q',
-            opacity=alt.condition(nearest, alt.value(1), alt.value(0))
-        )
-        
-        trade_chart = alt.layer(line_chart, area_chart, trade_points, vertical_rule).resolve_scale(y='independent').properties(
-            height=280, title=alt.TitleParams(f"{st.session_state.selected_country} 무역 데이터", anchor='start', fontSize=16)
-        )
-
-        final_chart = alt.vconcat(
-            kospi_chart,
-            trade_chart,
-            spacing=30
-        ).properties(
-            bounds='flush'
-        ).resolve_legend(
-            color="independent"
-        ).configure_view(
-            stroke=None
-        )
-
-        st.altair_chart(final_chart, use_container_width=True)
-
-
-    def _render_controls(self, min_date: datetime, max_date: datetime):
+    def _render_top_movers(self, metrics_index: metrics_engine.MetricsIndex):
+        """
+        최신 월 기준으로 전월·전년 대비 변동이 가장 큰 국가들을 상승/하락으로 나눠 보여줍니다.
+        수출액·수입액은 증감률, 무역수지는 부호가 바뀔 수 있으므로 증감액으로 순위를 매깁니다.
+        """
+        with st.container(border=True):
+            st.subheader("주요 변동 국가")
+            metric_options = {'수출액': 'export_amount', '수입액': 'import_amount', '무역수지': 'trade_balance'}
+            basis_options = {'전월 대비': 'mom', '전년 대비': 'yoy'}
+            cols = st.columns(2)
+            metric_label = cols[0].selectbox('**지표**', list(metric_options), key='movers_metric')
+            basis_label = cols[1].selectbox('**기준**', list(basis_options), key='movers_basis')
+
+            col_name, basis = metric_options[metric_label], basis_options[basis_label]
+            by_amount = col_name == 'trade_balance'
+            sort_column = f"{col_name}_{basis}_change" if by_amount else f"{col_name}_{basis}"
+            gainers, decliners = metrics_engine.top_movers(
+                metrics_index.summary, sort_column, n=TOP_MOVERS, exclude=[trade_store.TOTAL_COUNTRY]
+            )
+
+            def to_table(movers):
+                change = movers[sort_column] / 1e9 if by_amount else movers[sort_column]
+                return pd.DataFrame({
+                    '국가': movers['country_name'].astype(str).to_numpy(),
+                    '기준월': movers['Date'].dt.strftime('%Y-%m').to_numpy(),
+                    f'{metric_label} ($B)': (movers[col_name] / 1e9).round(2).to_numpy(),
+                    '증감액 ($B)' if by_amount else '증감률 (%)': change.round(2).to_numpy(),
+                })
+
+            table_cols = st.columns(2)
+            table_cols[0].markdown("**상승 상위**")
+            table_cols[0].dataframe(to_table(gainers), hide_index=True, use_container_width=True)
+            table_cols[1].markdown("**하락 상위**")
+            table_cols[1].dataframe(to_table(decliners), hide_index=True, use_container_width=True)
+
+    def _render_correlation_panel(self, engine: correlation.LeadLagCorrelation, trade_version, kospi_version: int):
+        """
+        무역 파생 지표와 KOSPI 200 월간 수익률의 선행·후행 상관계수 히트맵과,
+        선택된 국가의 최대 상관 시차 기준 이동 상관계수를 보여줍니다.
+        """
+        with st.expander("무역–KOSPI 선행·후행 상관관계", expanded=False):
+            cols = st.columns([2, 1])
+            metric = cols[0].selectbox('**무역 지표**', engine.metrics, format_func=correlation.metric_label, key='corr_metric')
+            # 국가가 하나뿐이면 슬라이더의 최솟값과 최댓값이 같아 만들 수 없으므로 건너뜁니다.
+            if len(engine.countries) <= 1:
+                n_countries = len(engine.countries)
+            else:
+                if st.session_state.get('corr_countries', 0) > len(engine.countries) or 'corr_countries' not in st.session_state:
+                    st.session_state.corr_countries = min(HEATMAP_COUNTRIES, len(engine.countries))
+                n_countries = cols[1].slider('**표시할 국가 수**', 1, len(engine.countries), key='corr_countries')
+
+            best = engine.best_lags(metric)
+            countries = best['country_name'].head(n_countries).tolist()
+            key = ('correlation', metric, n_countries)
+            (spec, payload), hit = self._get_spec_cache(trade_version, kospi_version).lookup(
+                key, lambda: chart_builder.build_heatmap_spec(engine.frame(metric), countries, f"{correlation.metric_label(metric)} × KOSPI 200 월간 수익률", engine.lags)
+            )
+            self._profile.cache('correlation', hit)
+            st.vega_lite_chart(spec, use_container_width=True)
+            st.caption(f"|상관계수| 최댓값이 큰 순서로 {len(countries)}개국 표시, 겹치는 달이 {engine.min_periods}개 미만인 칸은 비워 둡니다.")
+
+            country = st.session_state.selected_country
+            row = best[best['country_name'] == country]
+            if row.empty:
+                return
+            lag, corr = int(row['lag'].iloc[0]), row['corr'].iloc[0]
+            st.markdown(f"**{country}**: 시차 {lag:+d}개월에서 상관계수 {corr:+.3f} (이동 창 {correlation.ROLLING_WINDOW}개월)")
+            st.line_chart(engine.rolling(metric, lag)[country].dropna().rename('이동 상관계수'), height=200)
+
+    def _render_charts(self, df: pd.DataFrame, cols_to_use: list, trade_version, kospi_version: int):
+        """
+        상호작용 기능이 포함된 Altair 차트를 렌더링합니다.
+        [수정] 스펙은 chart_builder에서 단일 데이터셋으로 만들고, 보기 상태별로 캐시된 것을 재사용합니다.
+        """
+        state = st.session_state
+        key = (state.selected_country, state.is_12m_trailing, state.show_yoy_growth,
+               state.start_date_input, state.end_date_input, CHART_MAX_POINTS)
+        with self._profile.stage('charts'):
+            (spec, payload), hit = self._get_spec_cache(trade_version, kospi_version).lookup(
+                key, lambda: chart_builder.build_spec(df, cols_to_use, state.selected_country, state.show_yoy_growth, CHART_MAX_POINTS)
+            )
+            self._profile.cache('charts', hit)
+
+            st.vega_lite_chart(spec, use_container_width=True)
+            st.caption(f"차트 데이터: {payload['rows']:,} / {payload['source_rows']:,}행, {payload['bytes'] / 1024:,.1f} KB")
+
+    @st.fragment(run_every=LOAD_POLL_SECONDS)
+    def _poll_until_ready(self, task: data_loader.BackgroundTask):
+        """백그라운드 로딩이 끝나면 앱 전체를 다시 실행해, 먼저 그린 화면에 나머지를 채웁니다."""
+        if task.done():
+            st.rerun()
+
+    def _render_debug_panel(self, record: dict, dataset: trade_store.TradeDataset):
+        """단계별 소요 시간·캐시 적중·메모리와 프로세스 전체 백분위수를 보여주는 디버그 패널입니다."""
+        with st.expander("성능 디버그", expanded=False):
+            marks = ' · '.join(f"{name} {ms:.1f}ms" for name, ms in record['marks'].items())
+            st.caption(f"세션 {record['session_id']} · 실행 {record['run_id']} · 전체 {record['total_ms']:.1f}ms" + (f" · {marks}" if marks else ""))
+            st.caption(
+                f"무역 데이터 {len(dataset.countries)}개국, 메모리 {dataset.memory_before / 1024**2:,.2f} MB → "
+                f"{dataset.memory_after / 1024**2:,.2f} MB (압축 표현)"
+            )
+            st.dataframe(pd.DataFrame.from_dict(record['stages'], orient='index'), use_container_width=True)
+            st.markdown("**단계별 소요 시간 백분위수 (ms, 최근 측정값 기준)**")
+            st.dataframe(pd.DataFrame.from_dict(profiling.STATS.summary(), orient='index'), use_container_width=True)
+
+    def _render_controls(self, min_date: datetime, max_date: datetime, country_options: list):
         """컨트롤 패널을 렌더링하고 사용자 입력을 처리합니다."""
         with st.expander("데이터 보기 및 기간 설정", expanded=True):
             cols = st.columns([1, 1, 2])
             with cols[0]:
-                st.selectbox('**국가 선택**', COUNTRY_OPTIONS, key='selected_country', on_change=self.update_states)
+                st.selectbox('**국가 선택**', country_options, key='selected_country', on_change=self.update_states)
             with cols[1]:
-                st.radio('**형태 (무역)**', ['월별', '12개월 누적'], index=1 if st.session_state.is_12m_trailing else 0, key='data_form', horizontal=True, on_change=self.update_states)
+                st.radio('**형태 (무역)**', ['월별', '12개월 누적'], key='data_form', horizontal=True, on_change=self.update_states)
             with cols[2]:
-                st.radio('**단위 (무역)**', ['금액', 'YoY'], index=1 if st.session_state.show_yoy_growth else 0, key='unit_form', horizontal=True, on_change=self.update_states)
+                st.radio('**단위 (무역)**', ['금액', 'YoY'], key='unit_form', horizontal=True, on_change=self.update_states)
             
             st.divider()
 
@@ -242,52 +353,99 @@ class Dashboard:
         st.session_state.show_yoy_growth = (st.session_state.unit_form == 'YoY')
 
     def run(self):
-        """대시보드 애플리케이션을 실행합니다."""
-        with st.spinner('데이터를 불러오는 중입니다...'):
-            trade_data_base, kospi_data, kospi_msg = self._load_and_prepare_data()
+        """
+        대시보드 애플리케이션을 실행합니다.
+        [수정] 무역 데이터와 KOSPI 데이터를 동시에 읽기 시작하고, 무역 데이터가 준비되면 제목과 메트릭 카드부터 그립니다.
+        KOSPI 데이터가 시간 예산(LOAD_TIMEOUT) 안에 오지 않으면 차트 자리를 비워 두고, 준비되는 대로 다시 실행해 채웁니다.
+        """
+        deadline = data_loader.Deadline(LOAD_TIMEOUT)
+        with self._profile.stage('load'):
+            self._profile.cache('load', hit=True)
+            trade_version = data_handler.trade_data_version()
+            trade_task = self._start_trade_load(trade_version)
+            kospi_version = data_handler.kospi_data_version()
+            kospi_task = self._start_kospi_load(kospi_version)
+            with st.spinner('무역 데이터를 불러오는 중입니다...'):
+                trade_ready = trade_task.wait(deadline.remaining())
 
-        if trade_data_base is None or kospi_data is None:
-            st.error("데이터 로딩에 실패했습니다. 파일을 확인하거나 인터넷 연결을 점검해주세요.")
-            if kospi_msg: st.warning(kospi_msg)
+        if not trade_ready:
+            st.info("무역 데이터를 불러오는 중입니다. 준비되면 화면이 자동으로 갱신됩니다.")
+            self._poll_until_ready(trade_task)
             return
-        
-        # [수정] 데이터 로딩 후, 메인 로직에서 파생 변수를 계산합니다.
-        processed_dataframes = []
-        for country in trade_data_base['country_name'].unique():
-            country_df = trade_data_base[trade_data_base['country_name'] == country].sort_values('Date').copy()
-            for col in ['export_amount', 'import_amount', 'trade_balance']:
-                country_df[f'{col}_trailing_12m'] = country_df[col].rolling(window=12).sum()
-                country_df[f'{col}_yoy_growth'] = country_df[col].pct_change(periods=12) * 100
-                country_df[f'{col}_trailing_12m_yoy_growth'] = country_df[f'{col}_trailing_12m'].pct_change(periods=12) * 100
-            processed_dataframes.append(country_df)
-        trade_data_processed = pd.concat(processed_dataframes)
-        
-        min_date_for_controls = trade_data_processed['Date'].min()
-        max_date_for_controls = kospi_data['Date'].max()
-        
+        try:
+            trade_data = trade_task.result()
+        except Exception as e:
+            # 실패한 작업은 캐시에서 지워, 다음 재실행 때 다시 시도합니다.
+            self._start_trade_load.clear()
+            st.error(f"무역 데이터 로딩 중 오류가 발생했습니다: {e}")
+            return
+        if trade_data is None:
+            st.error("무역 데이터 로딩에 실패했습니다. 파일을 확인해주세요.")
+            return
+
+        # [수정] 컨트롤의 기간 범위는 KOSPI 데이터에 따라 정해지므로, 자리만 잡아 두고 KOSPI를 기다린 뒤 채웁니다.
+        controls_slot = st.container()
+
+        # [수정] 국가 목록은 하드코딩하지 않고 데이터에서 가져옵니다.
+        dataset = self._get_dataset(trade_version)
+        if st.session_state.selected_country not in dataset.ranges:
+            st.session_state.selected_country = dataset.countries[0]
+        start_date = st.session_state.get('start_date_input')
+        end_date = st.session_state.get('end_date_input')
+
+        # [수정] 최신 월 지표는 데이터 버전당 한 번 만든 색인에서 조회합니다.
+        with self._profile.stage('metrics'):
+            metrics_index = self._get_metrics_index(trade_version)
+            latest = metrics_index.get(st.session_state.selected_country, start_date, end_date)
+            self._profile.cache('metrics', latest is not None)
+            country_df = None
+            if latest is None:
+                country_df = dataset.country_frame(st.session_state.selected_country)
+                if start_date is not None:
+                    country_df = country_df[country_df['Date'].between(pd.Timestamp(start_date), pd.Timestamp(end_date))]
+            self._render_header_and_metrics(country_df, latest)
+        self._profile.mark('first_paint')
+
+        chart_slot = st.container()
+
+        with self._profile.stage('movers'):
+            self._render_top_movers(metrics_index)
+
+        with self._profile.stage('kospi_wait'):
+            kospi_ready = kospi_task.wait(deadline.remaining())
+        kospi_data, kospi_msg = None, None
+        if kospi_ready:
+            try:
+                kospi_data, kospi_msg = kospi_task.result()
+            except Exception as e:
+                self._start_kospi_load.clear()
+                kospi_msg = f"KOSPI 데이터 로딩 중 오류 발생: {e}"
+
+        # [수정] KOSPI가 없어도 컨트롤은 항상 그립니다. 기간 상한은 KOSPI가 없으면 무역 데이터의 마지막 달 말일입니다.
+        min_date_for_controls = dataset.frame['Date'].min()
+        if kospi_data is not None:
+            max_date_for_controls = kospi_data['Date'].max()
+        else:
+            max_date_for_controls = dataset.frame['Date'].max() + pd.offsets.MonthEnd(0)
         if 'start_date_input' not in st.session_state:
             st.session_state.start_date_input = (max_date_for_controls - pd.DateOffset(years=10)).date()
         if 'end_date_input' not in st.session_state:
             st.session_state.end_date_input = max_date_for_controls.date()
+        with controls_slot:
+            self._render_controls(min_date_for_controls, max_date_for_controls, dataset.countries)
 
-        self._render_controls(min_date_for_controls, max_date_for_controls)
-
-        trade_country_filtered = trade_data_processed[trade_data_processed['country_name'] == st.session_state.selected_country].copy()
-        
-        full_display_df = pd.merge(trade_country_filtered, kospi_data, on='Date', how='outer').sort_values(by='Date')
-        
-        display_df_filtered = full_display_df[
-            (full_display_df['Date'] >= pd.to_datetime(st.session_state.start_date_input)) & 
-            (full_display_df['Date'] <= pd.to_datetime(st.session_state.end_date_input))
-        ]
-        
-        self._render_header_and_metrics(display_df_filtered)
-        
-        if display_df_filtered.empty:
-            st.warning("선택된 기간에 표시할 데이터가 없습니다.")
+        if kospi_data is not None:
+            self._profile.frame('load', trade_data, kospi_data)
+            self._render_kospi_sections(chart_slot, kospi_data, trade_version, kospi_version)
+        elif not kospi_ready:
+            with chart_slot:
+                st.info("KOSPI 데이터를 불러오는 중입니다. 준비되면 차트가 자동으로 표시됩니다.")
+                self._poll_until_ready(kospi_task)
         else:
-            self._render_charts(display_df_filtered)
-        
+            with chart_slot:
+                st.error("KOSPI 데이터 로딩에 실패했습니다. 인터넷 연결을 점검해주세요.")
+                if kospi_msg: st.warning(kospi_msg)
+
         st.info("""
         **차트 사용법**
         - **기간 변경**: 하단의 '데이터 보기 및 기간 설정'에서 **기간 버튼**을 누르거나, **시작일**과 **종료일**을 직접 선택하세요.
@@ -301,6 +459,39 @@ class Dashboard:
                 "- **KOSPI 200 데이터**: `yfinance` (원본: **Yahoo Finance**)"
             )
 
+        record = self._profile.finish()
+        if record is not None:
+            self._render_debug_panel(record, dataset)
+
+    def _render_kospi_sections(self, chart_slot, kospi_data: pd.DataFrame, trade_version, kospi_version: int):
+        """KOSPI 데이터가 필요한 차트와 상관관계 패널을 그립니다. 차트는 미리 잡아 둔 자리에 넣습니다."""
+        # [수정] 보기별로 미리 병합된 데이터에서 기간만 이진 탐색으로 잘라냅니다.
+        views = self._get_view_cache(trade_version, kospi_version)
+        with self._profile.stage('view'):
+            view, hit = views.lookup(
+                st.session_state.selected_country, st.session_state.is_12m_trailing, st.session_state.show_yoy_growth
+            )
+            display_df_filtered = view.slice(st.session_state.start_date_input, st.session_state.end_date_input)
+            self._profile.cache('view', hit)
+            self._profile.frame('view', display_df_filtered)
+
+        with chart_slot:
+            if display_df_filtered.empty:
+                st.warning("선택된 기간에 표시할 데이터가 없습니다.")
+            else:
+                self._render_charts(display_df_filtered, view.columns, trade_version, kospi_version)
+
+        with self._profile.stage('correlation'):
+            self._render_correlation_panel(self._get_correlations(trade_version, kospi_version), trade_version, kospi_version)
+
+
+def _prepare_kospi_data():
+    """KOSPI 데이터를 가져와(필요하면 네트워크 갱신) 차트용 월별 데이터로 바꿉니다. 백그라운드 스레드에서 실행됩니다."""
+    kospi_data, kospi_msg = data_handler.get_and_update_kospi_data()
+    if kospi_data is None:
+        return None, kospi_msg
+    return data_handler.process_kospi_for_chart(kospi_data), kospi_msg
+
 if __name__ == "__main__":
     app = Dashboard()
     app.run()
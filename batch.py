@@ -0,0 +1,109 @@
+# batch.py
+"""
+Streamlit 없이 모든 국가의 파생 지표와 최신 월 요약을 미리 계산해 파일로 저장하는 배치 CLI.
+
+    python batch.py --output batch_output --workers 8
+
+출력 구조 (Parquet, hive 파티션):
+    <output>/series/country_name=<국가>/part-0.parquet   국가별 원본 + 파생 지표 시계열
+    <output>/summary.parquet                             국가별 최신 월 값과 전월·전년 대비 증감률
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import quote
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import trade_store
+import metrics_engine
+
+DEFAULT_OUTPUT = "batch_output"
+CHUNKS_PER_WORKER = 4  # 작업 분배를 고르게 하기 위해 워커당 나누는 묶음 수
+
+
+def partition_path(output_dir, country):
+    """국가별 hive 파티션 디렉터리 경로 (국가명은 URI 인코딩)."""
+    return os.path.join(output_dir, 'series', f"country_name={quote(str(country), safe='')}")
+
+
+def process_countries(countries, csv_path, store_path, output_dir):
+    """
+    국가 묶음 하나를 처리합니다: 필요한 국가만 읽어 파생 지표를 계산하고,
+    국가별 파티션에 시계열을 기록한 뒤 최신 월 요약을 반환합니다.
+    """
+    trade_df = trade_store.load_trade_frame(csv_path, store_path, countries=countries)
+    derived_df = metrics_engine.add_derived_metrics(trade_df)
+    derived_df['country_name'] = derived_df['country_name'].astype(str)
+
+    for country, country_df in derived_df.groupby('country_name', sort=False):
+        path = partition_path(output_dir, country)
+        os.makedirs(path, exist_ok=True)
+        table = pa.Table.from_pandas(country_df.drop(columns='country_name'), preserve_index=False)
+        pq.write_table(table, os.path.join(path, 'part-0.parquet'))
+    return metrics_engine.latest_summary(derived_df)
+
+
+def list_countries(csv_path, store_path):
+    """원본에 있는 국가 목록을 반환합니다 (국가 열만 읽습니다)."""
+    trade_df = trade_store.load_trade_frame(csv_path, store_path, columns=[])
+    if trade_df is None:
+        return None
+    return sorted(trade_df['country_name'].astype(str).unique())
+
+
+def run(csv_path=trade_store.TRADE_CSV, store_path=trade_store.TRADE_STORE, output_dir=DEFAULT_OUTPUT, workers=None):
+    """
+    국가를 묶음으로 나눠 프로세스 풀에서 병렬 처리합니다.
+    반환값은 (처리한 국가 수, 소요 시간(초)) 이며, 원본이 없으면 None입니다.
+    [수정] 최신 Arrow 저장소가 없으면 작업을 나누기 전에 CSV를 임시 저장소로 한 번만 변환합니다.
+    그러지 않으면 묶음마다 워커가 전체 CSV를 다시 파싱해, 병렬화할수록 오히려 느려집니다.
+    대시보드가 읽는 store_path에는 쓰지 않으며, 임시 저장소는 작업이 끝나면 지웁니다.
+    """
+    with tempfile.TemporaryDirectory(prefix='batch_store_') as tmp_dir:
+        if not trade_store.store_is_current(csv_path, store_path) and os.path.exists(csv_path):
+            store_path = trade_store.convert_csv_to_store(csv_path, os.path.join(tmp_dir, 'trade_data.arrow'))
+        countries = list_countries(csv_path, store_path)
+        if countries is None:
+            return None
+
+        workers = workers or os.cpu_count() or 1
+        n_chunks = max(1, min(len(countries), workers * CHUNKS_PER_WORKER))
+        chunks = [countries[i::n_chunks] for i in range(n_chunks)]
+
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(process_countries, chunk, csv_path, store_path, output_dir) for chunk in chunks]
+            summaries = [future.result() for future in futures]
+
+    summary = pd.concat(summaries, ignore_index=True).sort_values('country_name').reset_index(drop=True)
+    os.makedirs(output_dir, exist_ok=True)
+    pq.write_table(pa.Table.from_pandas(summary, preserve_index=False), os.path.join(output_dir, 'summary.parquet'))
+    return len(countries), time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="국가별 무역 파생 지표와 최신 월 요약을 미리 계산합니다.")
+    parser.add_argument('--csv', default=trade_store.TRADE_CSV)
+    parser.add_argument('--store', default=trade_store.TRADE_STORE)
+    parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    parser.add_argument('--workers', type=int, default=None, help="프로세스 수 (기본값: CPU 코어 수)")
+    args = parser.parse_args(argv)
+
+    result = run(args.csv, args.store, args.output, args.workers)
+    if result is None:
+        print(f"무역 데이터 원본({args.csv})을 찾을 수 없습니다.")
+        return 1
+    n_countries, seconds = result
+    print(f"{n_countries}개국 처리 완료: {seconds:.2f}초, {n_countries / seconds:,.1f} countries/sec -> {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
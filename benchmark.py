@@ -0,0 +1,180 @@
+# benchmark.py
+"""
+합성 데이터로 데이터 준비 파이프라인의 단계별 소요 시간을 측정합니다.
+
+    python benchmark.py                          # 결과를 bench_results.json에 기록
+    python benchmark.py --baseline base.json     # 기준선과 비교해 회귀를 표시 (회귀 시 종료 코드 1)
+    python benchmark.py --write-baseline base.json
+    python benchmark.py --startup                # app 모듈 콜드 임포트 시간과 첫 화면(메트릭 카드)까지의 시간
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+# chart_builder는 altair를 처음 차트를 만들 때 가져옵니다. 임포트 시간이 spec_build 측정에 섞이지 않도록 미리 가져옵니다.
+import altair  # noqa: F401
+
+import synthetic_data
+import trade_store
+import metrics_engine
+import kospi_store
+import view_cache
+import chart_builder
+import correlation
+
+SCALES = [(3, 10), (50, 10), (250, 10), (3, 30), (50, 30), (250, 30)]  # (국가 수, 연수)
+STAGES = ['load', 'derive', 'filter_merge', 'chart_data', 'spec_build', 'serialize', 'correlation']
+DEFAULT_THRESHOLD = 0.2  # 기준선보다 20% 이상 느려지면 회귀로 판단
+END_DATE = '2024-05-01'
+
+
+def _best_of(repeat, func):
+    """func를 repeat번 실행해 가장 짧은 소요 시간(초)과 마지막 결과를 반환합니다."""
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def run_scale(n_countries: int, n_years: int, repeat: int = 3, max_points=None, seed: int = 0) -> dict:
+    """한 규모(국가 수 × 연수)에 대해 각 단계의 최소 소요 시간을 측정합니다."""
+    n_months = n_years * 12
+    start = (pd.Timestamp(END_DATE) - pd.DateOffset(months=n_months - 1)).strftime('%Y-%m-%d')
+    raw_df = synthetic_data.make_trade_data(n_countries, n_months, start=start, seed=seed)
+    kospi_monthly = kospi_store.to_monthly(synthetic_data.make_kospi_years(n_years, end=END_DATE, seed=seed))
+    country = synthetic_data.country_names(n_countries)[-1]
+    timings = {}
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        csv_path = os.path.join(tmp_dir, 'trade_data.csv')
+        store_path = os.path.join(tmp_dir, 'trade_data.arrow')
+        raw_df.to_csv(csv_path, index=False)
+        trade_store.convert_csv_to_store(csv_path, store_path)
+        timings['load'], loaded_df = _best_of(repeat, lambda: trade_store.load_trade_frame(csv_path, store_path))
+
+    timings['derive'], trade_df = _best_of(repeat, lambda: metrics_engine.add_derived_metrics(loaded_df))
+    dataset = trade_store.TradeDataset(trade_df.astype({'country_name': object}))
+    memory = {
+        'before': dataset.memory_before,
+        'after': dataset.memory_after,
+        'after_float32': trade_store.TradeDataset(trade_df, float32=True).memory_after,
+    }
+    timings['filter_merge'], view = _best_of(repeat, lambda: view_cache.build_view(dataset.country_frame(country), kospi_monthly, True, False))
+    display_df = view.slice(view.display_df['Date'].min(), view.display_df['Date'].max())
+    timings['chart_data'], chart_df = _best_of(repeat, lambda: chart_builder.chart_data(display_df, view.columns, max_points))
+    timings['spec_build'], spec = _best_of(repeat, lambda: chart_builder.build_chart(chart_df, country, False).to_dict())
+    spec['datasets'] = {chart_builder.DATASET_NAME: chart_builder.to_records(chart_df)}
+    timings['serialize'], payload = _best_of(repeat, lambda: json.dumps(spec, ensure_ascii=False))
+    timings['correlation'], _ = _best_of(repeat, lambda: correlation.LeadLagCorrelation(trade_df, kospi_monthly))
+
+    return {
+        'rows': len(trade_df),
+        'memory_bytes': memory,
+        'payload_bytes': len(payload.encode()),
+        'seconds': timings,
+    }
+
+
+def measure_startup(repeat: int = 5) -> dict:
+    """
+    새 프로세스에서 app 모듈을 가져오는 데 걸린 시간(초)의 중앙값과, AppTest 실행에서 프로파일러가 기록한
+    첫 화면 시점(ms)을 측정합니다. 첫 실행은 캐시가 비어 있는 콜드 스타트이고, 이후 실행은 캐시가 채워진 상태입니다.
+    """
+    import_seconds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', 'import app'], check=True, capture_output=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+        import_seconds.append(time.perf_counter() - start)
+
+    from streamlit.testing.v1 import AppTest
+    import profiling
+    first_paint_ms, total_ms = [], []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        log_path = os.path.join(tmp_dir, 'profile.jsonl')
+        os.environ[profiling.PROFILE_ENV], os.environ[profiling.PROFILE_LOG_ENV] = '1', log_path
+        for _ in range(repeat):
+            AppTest.from_file(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.py'), default_timeout=60).run()
+            with open(log_path, encoding='utf-8') as f:
+                record = json.loads(f.readlines()[-1])
+            first_paint_ms.append(record['marks'].get('first_paint', float('nan')))
+            total_ms.append(record['total_ms'])
+    return {
+        'import_seconds': statistics.median(import_seconds),
+        'first_paint_ms': first_paint_ms[0],
+        'total_ms': total_ms[0],
+        'warm_first_paint_ms': statistics.median(first_paint_ms[1:]) if repeat > 1 else None,
+        'warm_total_ms': statistics.median(total_ms[1:]) if repeat > 1 else None,
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float = DEFAULT_THRESHOLD) -> list:
+    """기준선 대비 (1 + threshold)배를 넘게 느려진 (규모, 단계, 기준, 현재) 목록을 반환합니다."""
+    regressions = []
+    for scale, result in results.items():
+        base = baseline.get(scale)
+        if base is None:
+            continue
+        for stage, seconds in result['seconds'].items():
+            base_seconds = base['seconds'].get(stage)
+            if base_seconds and seconds > base_seconds * (1 + threshold):
+                regressions.append((scale, stage, base_seconds, seconds))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="무역 대시보드 데이터 파이프라인 벤치마크")
+    parser.add_argument('--scales', nargs='*', help="'국가수x연수' 형식 (예: 50x10). 기본값은 표준 규모 전체")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--max-points', type=int, default=None, help="차트 시계열별 최대 점 개수 (LTTB)")
+    parser.add_argument('--output', default='bench_results.json')
+    parser.add_argument('--baseline', help="비교할 기준선 JSON 파일")
+    parser.add_argument('--write-baseline', help="이번 결과를 기준선으로 저장할 경로")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument('--startup', action='store_true', help="앱 콜드 임포트 시간과 첫 화면까지의 시간만 측정")
+    args = parser.parse_args(argv)
+
+    if args.startup:
+        startup = measure_startup(args.repeat)
+        print(f"import={startup['import_seconds'] * 1000:.0f}ms cold: first_paint={startup['first_paint_ms']:.1f}ms total={startup['total_ms']:.1f}ms")
+        if startup['warm_total_ms'] is not None:
+            print(f"warm: first_paint={startup['warm_first_paint_ms']:.1f}ms total={startup['warm_total_ms']:.1f}ms")
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'startup': startup}, f, ensure_ascii=False, indent=2)
+        return 0
+
+    scales = [tuple(int(v) for v in s.split('x')) for s in args.scales] if args.scales else SCALES
+    results = {}
+    for n_countries, n_years in scales:
+        key = f"{n_countries}x{n_years}"
+        results[key] = run_scale(n_countries, n_years, args.repeat, args.max_points)
+        stages = ' '.join(f"{stage}={results[key]['seconds'][stage] * 1000:.1f}ms" for stage in STAGES)
+        memory = ' -> '.join(f"{v / 1024**2:,.1f}MB" for v in results[key]['memory_bytes'].values())
+        print(f"[{key}] rows={results[key]['rows']:,} memory={memory} payload={results[key]['payload_bytes'] / 1024:,.1f}KB {stages}")
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    if args.write_baseline:
+        with open(args.write_baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for scale, stage, base_seconds, seconds in regressions:
+            print(f"회귀: [{scale}] {stage} {base_seconds * 1000:.1f}ms -> {seconds * 1000:.1f}ms")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,221 @@
+# chart_builder.py
+
+import json
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+import numpy as np
+import pandas as pd
+
+import correlation
+
+# altair는 가져오는 데 수백 ms가 걸리므로, 차트를 처음 만들 때 가져옵니다.
+if TYPE_CHECKING:
+    import altair as alt
+
+PRIMARY_COLOR = "#0d6efd"
+SECONDARY_COLOR = "#dc3545"
+TERTIARY_COLOR = "#198754"
+KOSPI_COLOR = "#FF9900"
+METRIC_LABELS = ['수출', '수입', '무역수지']
+DATASET_NAME = 'view'
+LAG_TICK_STEP = 6  # 히트맵 시차 축 눈금 간격(개월)
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets 알고리즘으로 선의 모양을 보존하는 n_out개의 점 위치를 고릅니다.
+    첫 점과 마지막 점은 항상 포함됩니다.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    selected = np.empty(n_out, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    prev = 0
+    for b in range(n_out - 2):
+        lo, hi = edges[b], edges[b + 1]
+        nxt_lo, nxt_hi = hi, edges[b + 2] if b + 2 < len(edges) else n
+        avg_x, avg_y = x[nxt_lo:nxt_hi].mean(), y[nxt_lo:nxt_hi].mean()
+        area = np.abs((x[prev] - avg_x) * (y[lo:hi] - y[prev]) - (x[prev] - x[lo:hi]) * (avg_y - y[prev]))
+        prev = lo + int(np.argmax(area))
+        selected[b + 1] = prev
+    return selected
+
+
+def downsample(chart_df: pd.DataFrame, max_points: int) -> pd.DataFrame:
+    """
+    값 열마다 LTTB로 점을 고른 뒤 그 합집합만 남깁니다.
+    max_points가 None이거나 행 수가 이미 작으면 그대로 반환합니다.
+    """
+    if max_points is None or len(chart_df) <= max_points:
+        return chart_df
+
+    x = chart_df['Date'].to_numpy().astype('datetime64[s]').astype('float64')
+    keep = np.zeros(len(chart_df), dtype=bool)
+    for col in chart_df.columns.drop('Date'):
+        values = chart_df[col].to_numpy(dtype='float64')
+        valid = np.flatnonzero(~np.isnan(values))
+        keep[valid[lttb_indices(x[valid], values[valid], max_points)]] = True
+    return chart_df[keep]
+
+
+def chart_data(display_df: pd.DataFrame, cols_to_use: list, max_points=None) -> pd.DataFrame:
+    """차트에 필요한 열만 남기고 지표 열 이름을 한글 표시명으로 바꾼 단일 데이터셋을 만듭니다."""
+    chart_df = display_df[['Date', 'kospi_price'] + list(cols_to_use)]
+    chart_df = chart_df.set_axis(['Date', 'kospi_price'] + METRIC_LABELS, axis=1)
+    return downsample(chart_df, max_points)
+
+
+def build_chart(chart_df: pd.DataFrame, title: str, show_yoy_growth: bool) -> 'alt.VConcatChart':
+    """
+    KOSPI 차트와 무역 차트를 세로로 붙인 Altair 차트를 만듭니다.
+    데이터는 최상위에 한 번만 지정하고 모든 레이어가 이를 참조하며, 무역 지표는 transform_fold로 펼칩니다.
+    """
+    import altair as alt
+
+    nearest = alt.selection_point(on='mouseover', encodings=['x'], nearest=True, empty=False)
+
+    vertical_rule = alt.Chart().mark_rule(color='gray', strokeDash=[3,3]).encode(
+        x='Date:T',
+        tooltip=[
+            alt.Tooltip('Date:T', title='날짜', format='%Y-%m'),
+            alt.Tooltip('kospi_price:Q', title='KOSPI 200', format=',.2f'),
+        ] + [alt.Tooltip(f'{label}:Q', title=label, format='$,.2f') for label in METRIC_LABELS]
+    ).transform_filter(nearest)
+
+    base_chart = alt.Chart().add_params(nearest)
+
+    kospi_horizontal_rule = alt.Chart().mark_rule(color=KOSPI_COLOR, strokeDash=[3,3]).encode(
+        y=alt.Y('kospi_price:Q')
+    ).transform_filter(nearest)
+
+    kospi_chart_base = base_chart.transform_filter('isValid(datum.kospi_price)').mark_line(color=KOSPI_COLOR).encode(
+        x=alt.X('Date:T', title=None, axis=None),
+        y=alt.Y('kospi_price:Q', title='KOSPI 200', scale=alt.Scale(zero=False), axis=alt.Axis(tickCount=4, grid=False))
+    )
+    kospi_points = kospi_chart_base.mark_circle(size=60).encode(
+        opacity=alt.condition(nearest, alt.value(1), alt.value(0))
+    )
+    kospi_chart = alt.layer(kospi_chart_base, kospi_points, kospi_horizontal_rule, vertical_rule).properties(
+        height=110, title=alt.TitleParams("KOSPI 200 지수", anchor='start', fontSize=16)
+    )
+
+    y_axis_format = "format(datum.value / 1e9, '.0f') + 'B'" if not show_yoy_growth else "format(datum.value, '.1f') + '%'"
+
+    trade_base_chart = alt.Chart().transform_fold(
+        METRIC_LABELS, as_=['지표', '값']
+    ).transform_filter('isValid(datum.값)').add_params(nearest).encode(
+        x=alt.X('Date:T', title=None, axis=alt.Axis(format='%Y-%m', labelAngle=-45)),
+        color=alt.Color('지표:N', scale=alt.Scale(domain=METRIC_LABELS, range=[PRIMARY_COLOR, SECONDARY_COLOR, TERTIARY_COLOR]), legend=alt.Legend(title="구분", orient='top-left'))
+    )
+
+    line_chart = trade_base_chart.transform_filter(alt.datum.지표 != '무역수지').mark_line(strokeWidth=2.5).encode(
+        y=alt.Y('값:Q', title="금액 (수출입)", scale=alt.Scale(zero=False), axis=alt.Axis(labelExpr=y_axis_format))
+    )
+    area_chart = trade_base_chart.transform_filter(alt.datum.지표 == '무역수지').mark_area(opacity=0.4, line={'color': TERTIARY_COLOR}).encode(
+        y=alt.Y('값:Q', title="금액 (무역수지)", scale=alt.Scale(zero=True), axis=alt.Axis(labelExpr=y_axis_format))
+    )
+    trade_points = trade_base_chart.mark_circle(size=60).encode(
+        y='값:Q',
+        opacity=alt.condition(nearest, alt.value(1), alt.value(0))
+    )
+
+    trade_chart = alt.layer(line_chart, area_chart, trade_points, vertical_rule).resolve_scale(y='independent').properties(
+        height=280, title=alt.TitleParams(f"{title} 무역 데이터", anchor='start', fontSize=16)
+    )
+
+    return alt.vconcat(
+        kospi_chart,
+        trade_chart,
+        data=alt.Data(name=DATASET_NAME),
+        spacing=30
+    ).properties(
+        bounds='flush'
+    ).resolve_legend(
+        color="independent"
+    ).configure_view(
+        stroke=None
+    )
+
+
+def build_heatmap(countries: list, title: str, lags=correlation.LAGS) -> 'alt.Chart':
+    """
+    (국가 × 시차) 상관계수 히트맵을 만듭니다. 국가는 countries 순서로 위에서부터 놓습니다.
+    데이터는 build_spec과 같이 이름 있는 데이터셋 하나로 전달하며, 시차 축 눈금은 lags 중 LAG_TICK_STEP의 배수입니다.
+    """
+    import altair as alt
+
+    ticks = [int(lag) for lag in lags if lag % LAG_TICK_STEP == 0]
+    return alt.Chart(alt.Data(name=DATASET_NAME)).mark_rect().encode(
+        x=alt.X('lag:O', title='시차 (개월, +는 무역 지표 선행)', axis=alt.Axis(labelAngle=0, values=ticks)),
+        y=alt.Y('country_name:N', title=None, sort=list(countries)),
+        color=alt.Color('corr:Q', title='상관계수', scale=alt.Scale(scheme='redblue', domain=[-1, 1], reverse=True)),
+        tooltip=[
+            alt.Tooltip('country_name:N', title='국가'),
+            alt.Tooltip('lag:O', title='시차'),
+            alt.Tooltip('corr:Q', title='상관계수', format='.3f'),
+            alt.Tooltip('n:Q', title='표본 수'),
+        ],
+    ).properties(
+        height=alt.Step(14), title=alt.TitleParams(title, anchor='start', fontSize=16)
+    ).configure_view(
+        stroke=None
+    )
+
+
+def build_heatmap_spec(corr_df: pd.DataFrame, countries: list, title: str, lags=correlation.LAGS):
+    """히트맵 Vega-Lite 스펙과 전송량 정보를 build_spec과 같은 형식으로 반환합니다."""
+    corr_df = corr_df[corr_df['country_name'].isin(countries)]
+    spec = build_heatmap(countries, title, lags).to_dict()
+    spec['datasets'] = {DATASET_NAME: corr_df.round({'corr': 4}).to_dict(orient='records')}
+    payload = {'source_rows': len(corr_df), 'rows': len(corr_df), 'bytes': len(json.dumps(spec, ensure_ascii=False).encode())}
+    return spec, payload
+
+
+def to_records(chart_df: pd.DataFrame) -> list:
+    """날짜는 타임존 없는 ISO 문자열, 결측치는 None으로 바꿔 JSON 직렬화 가능한 레코드 목록을 만듭니다."""
+    records_df = chart_df.astype(object).where(chart_df.notna(), None)
+    records_df['Date'] = chart_df['Date'].dt.strftime('%Y-%m-%dT%H:%M:%S')
+    return records_df.to_dict(orient='records')
+
+
+def build_spec(display_df: pd.DataFrame, cols_to_use: list, title: str, show_yoy_growth: bool, max_points=None):
+    """
+    Vega-Lite 스펙(dict)을 만들고, 데이터는 최상위 datasets에 이름 하나로만 넣습니다.
+    (스펙, 전송량 정보)를 반환하며, 전송량 정보에는 원본/전송 행 수와 직렬화된 크기(바이트)가 들어 있습니다.
+    """
+    chart_df = chart_data(display_df, cols_to_use, max_points)
+    spec = build_chart(chart_df, title, show_yoy_growth).to_dict()
+    spec['datasets'] = {DATASET_NAME: to_records(chart_df)}
+    payload = {'source_rows': len(display_df), 'rows': len(chart_df), 'bytes': len(json.dumps(spec, ensure_ascii=False).encode())}
+    return spec, payload
+
+
+class SpecCache:
+    """보기 상태(국가, 형태, 단위, 기간, 점 예산)별로 build_spec 결과를 보관하는 LRU 캐시."""
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self._specs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, build):
+        return self.lookup(key, build)[0]
+
+    def lookup(self, key, build):
+        """(build 결과, 캐시 적중 여부)를 반환합니다. 캐시에 없을 때만 build()를 호출합니다."""
+        with self._lock:
+            spec = self._specs.get(key)
+            if spec is not None:
+                self._specs.move_to_end(key)
+                return spec, True
+        spec = build()
+        with self._lock:
+            self._specs[key] = spec
+            self._specs.move_to_end(key)
+            while len(self._specs) > self.max_entries:
+                self._specs.popitem(last=False)
+        return spec, False
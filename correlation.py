@@ -0,0 +1,170 @@
+# correlation.py
+"""
+무역 파생 지표와 KOSPI 200 월간 수익률 사이의 선행·후행(lead/lag) 상관계수.
+
+모든 국가 × 지표 × 시차를 (지표 × 국가 × 월) 밀집 배열과 (시차 × 월) 수익률 행렬의 행렬 곱 몇 번으로 계산합니다.
+시차 k > 0은 무역 지표가 KOSPI보다 k개월 앞선다는 뜻입니다: corr(지표[t], 수익률[t + k]).
+"""
+
+import numpy as np
+import pandas as pd
+
+import metrics_engine
+
+MAX_LAG = 24
+LAGS = np.arange(-MAX_LAG, MAX_LAG + 1)
+MIN_PERIODS = 24  # 겹치는 달이 이보다 적으면 상관계수를 NaN으로 둡니다
+ROLLING_WINDOW = 36
+BASE_LABELS = {'export_amount': '수출', 'import_amount': '수입', 'trade_balance': '무역수지'}
+SUFFIX_LABELS = {'_trailing_12m': '12개월 누적', '_yoy_growth': 'YoY', '_trailing_12m_yoy_growth': '12개월 누적 YoY'}
+
+
+def metric_label(column):
+    """파생 지표 열 이름을 화면 표시용 이름으로 바꿉니다 (예: 'export_amount_yoy_growth' -> '수출 YoY')."""
+    for base, label in BASE_LABELS.items():
+        if column.startswith(base):
+            suffix = column[len(base):]
+            return f"{label} {SUFFIX_LABELS[suffix]}" if suffix else label
+    return column
+
+
+def monthly_returns(kospi_df):
+    """
+    월별 KOSPI 종가로 월간 수익률(%)을 구해 {달력 월 인덱스: 수익률} 시리즈로 반환합니다.
+    무역 데이터(월초)와 KOSPI(월말)의 날짜 기준이 달라도 같은 달끼리 맞춰집니다.
+    """
+    prices = kospi_df.dropna(subset=['kospi_price'])
+    returns = pd.Series(prices['kospi_price'].to_numpy(dtype='float64'), index=metrics_engine.month_index(prices['Date']))
+    returns = returns[~returns.index.duplicated(keep='last')].sort_index()
+    # 빠진 달이 있으면 그 다음 달의 수익률은 계산하지 않습니다.
+    returns = returns.reindex(np.arange(returns.index.min(), returns.index.max() + 1))
+    return returns.pct_change(fill_method=None) * 100
+
+
+def shifted_returns(returns, first_month, n_months, lags=LAGS):
+    """
+    (시차 × 월) 행렬 R[l, t] = 수익률[first_month + t + lags[l]]을 만듭니다. 범위 밖은 NaN입니다.
+    """
+    months = first_month + np.arange(n_months)[None, :] + np.asarray(lags)[:, None]
+    return returns.reindex(months.ravel()).to_numpy().reshape(months.shape)
+
+
+def standardize(values):
+    """
+    마지막 축 기준으로 유효값의 평균을 빼고 표준편차로 나눕니다.
+    상관계수는 이 변환에 영향을 받지 않지만, 큰 금액끼리 곱할 때 생기는 자릿수 손실을 막아 줍니다.
+    """
+    valid = ~np.isnan(values)
+    count = np.maximum(valid.sum(axis=-1, keepdims=True), 1)
+    centered = values - np.where(valid, values, 0.0).sum(axis=-1, keepdims=True) / count
+    scale = np.sqrt(np.where(valid, centered ** 2, 0.0).sum(axis=-1, keepdims=True) / count)
+    return centered / np.where(scale > 0, scale, 1.0)
+
+
+def masked_correlation(x, y, min_periods=MIN_PERIODS):
+    """
+    x (..., 월)의 각 행과 y (시차, 월)의 각 행 사이의 상관계수를 (..., 시차) 배열로 구합니다.
+    둘 다 값이 있는 달만 쓰며(pairwise complete), 필요한 합계는 모두 행렬 곱으로 계산합니다.
+    반환값은 (상관계수, 겹치는 달 수)입니다.
+    """
+    x, y = standardize(x), standardize(y)
+    vx, vy = ~np.isnan(x), ~np.isnan(y)
+    x0, y0 = np.where(vx, x, 0.0), np.where(vy, y, 0.0)
+    vx, vy = vx.astype('float64'), vy.astype('float64')
+
+    n = vx @ vy.T
+    sx, sy = x0 @ vy.T, vx @ y0.T
+    sxx, syy = (x0 * x0) @ vy.T, vx @ (y0 * y0).T
+    sxy = x0 @ y0.T
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cov = n * sxy - sx * sy
+        var = (n * sxx - sx * sx) * (n * syy - sy * sy)
+        corr = cov / np.sqrt(var)
+    corr[(n < min_periods) | ~np.isfinite(corr)] = np.nan
+    return np.clip(corr, -1.0, 1.0), n.astype(int)
+
+
+def rolling_correlation(x, y, window=ROLLING_WINDOW, min_periods=None):
+    """
+    같은 모양(또는 브로드캐스트 가능한) x, y의 마지막 축을 따라 이동 상관계수를 구합니다.
+    누적합 차분으로 창마다의 합계를 한 번에 얻으므로 창 크기와 관계없이 O(월 수)입니다.
+    """
+    min_periods = window if min_periods is None else min_periods
+    x, y = np.broadcast_arrays(standardize(x), standardize(y))
+    valid = ~np.isnan(x) & ~np.isnan(y)
+    x0, y0 = np.where(valid, x, 0.0), np.where(valid, y, 0.0)
+
+    def window_sum(values):
+        csum = np.cumsum(values, axis=-1, dtype='float64')
+        out = csum.copy()
+        out[..., window:] -= csum[..., :-window]
+        return out
+
+    n = window_sum(valid)
+    sx, sy = window_sum(x0), window_sum(y0)
+    sxx, syy, sxy = window_sum(x0 * x0), window_sum(y0 * y0), window_sum(x0 * y0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        corr = (n * sxy - sx * sy) / np.sqrt((n * sxx - sx * sx) * (n * syy - sy * sy))
+    corr[(n < min_periods) | ~np.isfinite(corr)] = np.nan
+    return np.clip(corr, -1.0, 1.0)
+
+
+class LeadLagCorrelation:
+    """
+    모든 국가 × 파생 지표 × 시차의 전체 기간 상관계수를 한 번에 계산해 보관합니다.
+    데이터셋 버전당 한 번 만들고, 화면에서는 필요한 단면만 꺼내 씁니다.
+    """
+
+    def __init__(self, trade_df, kospi_df, metrics=None, lags=LAGS, min_periods=MIN_PERIODS):
+        self.metrics = list(metrics or metrics_engine.derived_columns())
+        self.lags = np.asarray(lags)
+        self.min_periods = min_periods
+
+        dense, _, _ = metrics_engine.to_dense(trade_df, self.metrics)
+        self.first_month = int(metrics_engine.month_index(trade_df['Date']).min())
+        self.n_months = dense.shape[-1]
+        self.countries = list(trade_df['country_name'].astype('category').cat.categories.astype(str))
+        self.returns = monthly_returns(kospi_df)
+        self._dense = dense
+
+        shifted = shifted_returns(self.returns, self.first_month, self.n_months, self.lags)
+        # (지표 × 국가, 월) @ (월, 시차) -> (지표 × 국가, 시차)
+        corr, n = masked_correlation(dense.reshape(-1, self.n_months), shifted, min_periods)
+        self.corr = corr.reshape(len(self.metrics), len(self.countries), len(self.lags))
+        self.n = n.reshape(self.corr.shape)
+
+    def frame(self, metric):
+        """한 지표의 (국가, 시차, 상관계수, 표본 수) 긴 형식 데이터프레임. 상관계수가 없는 칸은 뺍니다."""
+        i = self.metrics.index(metric)
+        df = pd.DataFrame({
+            'country_name': np.repeat(self.countries, len(self.lags)),
+            'lag': np.tile(self.lags, len(self.countries)),
+            'corr': self.corr[i].ravel(),
+            'n': self.n[i].ravel(),
+        })
+        return df.dropna(subset=['corr']).reset_index(drop=True)
+
+    def best_lags(self, metric):
+        """국가별로 |상관계수|가 가장 큰 시차와 그 값을 |상관계수| 내림차순으로 반환합니다."""
+        corr = self.corr[self.metrics.index(metric)]
+        has_value = ~np.isnan(corr).all(axis=1)
+        best = np.nanargmax(np.abs(np.where(np.isnan(corr), 0.0, corr)), axis=1)
+        rows = np.arange(len(self.countries))
+        df = pd.DataFrame({
+            'country_name': self.countries,
+            'lag': self.lags[best],
+            'corr': corr[rows, best],
+        })[has_value]
+        return df.iloc[np.argsort(-np.abs(df['corr'].to_numpy()), kind='stable')].reset_index(drop=True)
+
+    def rolling(self, metric, lag, window=ROLLING_WINDOW):
+        """
+        한 지표·시차에 대해 모든 국가의 이동 상관계수를 계산해 (월 × 국가) 데이터프레임으로 반환합니다.
+        인덱스는 각 달의 월초 날짜입니다.
+        """
+        x = self._dense[self.metrics.index(metric)]
+        y = shifted_returns(self.returns, self.first_month, self.n_months, [lag])
+        values = rolling_correlation(x, y, window, min(window, self.min_periods))
+        months = self.first_month + np.arange(self.n_months) - 1
+        dates = pd.to_datetime({'year': months // 12, 'month': months % 12 + 1, 'day': 1})
+        return pd.DataFrame(values.T, index=pd.DatetimeIndex(dates, name='Date'), columns=self.countries)
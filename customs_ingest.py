@@ -0,0 +1,275 @@
+# customs_ingest.py
+"""
+관세청 수출입 실적 원본(HS 코드 × 국가 × 월)을 조금씩 읽어 국가·월별 집계(trade_data.csv)로 만드는 적재 단계.
+
+    python customs_ingest.py --raw raw_customs            # 새로 들어오거나 바뀐 월만 처리한 뒤 trade_data.csv를 다시 만듦
+    python customs_ingest.py --raw raw_customs --force    # 모든 월을 다시 처리
+
+원본 파일은 월별로 나뉘어 있으며 파일 이름이 'YYYY-MM' 또는 'YYYYMM'으로 시작해야 합니다
+(예: 2024-05.csv, 202405_p2.jsonl). 지원 형식은 CSV, JSON Lines, API 응답 JSON입니다.
+파일은 CHUNK_ROWS 행씩 읽어 바로 집계하므로, 최대 메모리는 입력 크기가 아니라 (국가 × HS 류) 개수에 비례합니다.
+단, API 응답 JSON은 통째로 읽어야 하므로 MAX_JSON_BYTES보다 큰 파일은 거부합니다. 큰 원본은 JSON Lines로 받아 주세요.
+월별 집계 결과와 처리한 원본 정보를 상태 디렉터리에 남기므로, 중간에 멈춰도 끝난 월은 다시 처리하지 않습니다.
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import pandas as pd
+
+import trade_store
+
+RAW_DIR = "raw_customs"
+STATE_DIR = "customs_state"
+HS_CSV = "trade_data_hs.csv"
+MANIFEST = "manifest.json"
+CHUNK_ROWS = 100_000
+MAX_JSON_BYTES = 64 * 1024 * 1024  # API 응답 JSON 파일 하나의 최대 크기. 넘으면 JSON Lines로 받아야 합니다.
+RAW_EXTENSIONS = ('.csv', '.jsonl', '.ndjson', '.json')
+
+# 관세청 품목별·국가별 수출입실적 API 필드 -> 내부 열 이름
+RAW_COLUMNS = {
+    'year': 'period',
+    'statCdCntnKor1': 'country_name',
+    'hsCd': 'hs_code',
+    'expDlr': 'export_amount',
+    'impDlr': 'import_amount',
+}
+COUNTRY_KEYS = ['Date', 'country_name']
+HS_KEYS = ['Date', 'country_name', 'hs_chapter']
+SUM_COLUMNS = ['export_amount', 'import_amount']
+
+_MONTH_PATTERN = re.compile(r'^(\d{4})-?(\d{2})')
+
+
+def month_of(filename):
+    """파일 이름 앞부분에서 'YYYY-MM'을 꺼냅니다. 형식이 맞지 않으면 None입니다."""
+    match = _MONTH_PATTERN.match(os.path.basename(filename))
+    return f"{match.group(1)}-{match.group(2)}" if match else None
+
+
+def discover(raw_dir=RAW_DIR):
+    """원본 디렉터리의 파일을 월별로 묶어 {월: [경로, ...]}로 반환합니다 (월 순서)."""
+    months = {}
+    for name in sorted(os.listdir(raw_dir)):
+        month = month_of(name)
+        if month is not None and name.lower().endswith(RAW_EXTENSIONS):
+            months.setdefault(month, []).append(os.path.join(raw_dir, name))
+    return dict(sorted(months.items()))
+
+
+def source_stamp(paths):
+    """한 달치 원본 파일들의 (이름, 크기, 수정 시각) 목록. 이 값이 같으면 그 달은 다시 처리하지 않습니다."""
+    stamp = []
+    for path in paths:
+        stat = os.stat(path)
+        stamp.append([os.path.basename(path), stat.st_size, stat.st_mtime_ns])
+    return stamp
+
+
+def _api_items(document):
+    """API 응답 JSON(response.body.items.item) 또는 레코드 배열에서 레코드 목록을 꺼냅니다."""
+    if isinstance(document, list):
+        return document
+    items = document.get('response', {}).get('body', {}).get('items') or {}
+    items = items.get('item', []) if isinstance(items, dict) else items
+    return [items] if isinstance(items, dict) else items
+
+
+def iter_chunks(path, chunk_rows=CHUNK_ROWS):
+    """
+    원본 파일 하나를 chunk_rows 행 이하의 데이터프레임으로 나눠 차례로 돌려줍니다.
+    CSV와 JSON Lines는 파일을 끝까지 읽지 않고 스트리밍합니다.
+    API 응답 JSON은 한 번에 읽어야 하므로, 메모리 상한을 지키기 위해 MAX_JSON_BYTES보다 크면 ValueError를 냅니다.
+    """
+    lower = path.lower()
+    if lower.endswith('.csv'):
+        yield from pd.read_csv(path, usecols=lambda col: col in RAW_COLUMNS, dtype=str, chunksize=chunk_rows)
+    elif lower.endswith(('.jsonl', '.ndjson')):
+        yield from pd.read_json(path, lines=True, dtype=False, chunksize=chunk_rows)
+    else:
+        size = os.path.getsize(path)
+        if size > MAX_JSON_BYTES:
+            raise ValueError(
+                f"{path}: API 응답 JSON이 너무 큽니다({size:,}바이트 > {MAX_JSON_BYTES:,}바이트). "
+                "JSON Lines(.jsonl)로 받거나 더 작은 페이지로 나눠 주세요."
+            )
+        with open(path, encoding='utf-8') as f:
+            items = _api_items(json.load(f))
+        for start in range(0, len(items), chunk_rows):
+            yield pd.DataFrame.from_records(items[start:start + chunk_rows])
+
+
+def normalize(chunk):
+    """
+    원본 청크를 (Date, country_name, hs_chapter, export_amount, import_amount) 형식으로 바꿉니다.
+    기간을 해석할 수 없는 행(예: API의 '총계' 행)은 버립니다.
+    """
+    chunk = chunk.reindex(columns=list(RAW_COLUMNS)).rename(columns=RAW_COLUMNS)
+    digits = chunk['period'].astype(str).str.replace(r'\D', '', regex=True).str[:6]
+    out = pd.DataFrame({
+        'Date': pd.to_datetime(digits, format='%Y%m', errors='coerce'),
+        'country_name': chunk['country_name'].astype(str).str.strip(),
+        'hs_chapter': chunk['hs_code'].astype(str).str.strip().str[:2],
+    })
+    for col in SUM_COLUMNS:
+        out[col] = pd.to_numeric(chunk[col], errors='coerce').fillna(0.0)
+    return out[out['Date'].notna() & chunk['country_name'].notna().to_numpy()]
+
+
+def _reduce(acc, part, keys):
+    """누적 집계와 새 부분 집계를 합칩니다. 결과 크기는 키 조합 수를 넘지 않습니다."""
+    part = part.groupby(keys, sort=False)[SUM_COLUMNS].sum()
+    return part if acc is None else pd.concat([acc, part]).groupby(level=keys, sort=False).sum()
+
+
+def aggregate_month(paths, chunk_rows=CHUNK_ROWS, hs_breakdown=True):
+    """
+    한 달치 원본 파일들을 청크 단위로 집계해 (국가별 집계, HS 류별 집계 또는 None)을 반환합니다.
+    """
+    by_country, by_hs = None, None
+    for path in paths:
+        for chunk in iter_chunks(path, chunk_rows):
+            rows = normalize(chunk)
+            if rows.empty:
+                continue
+            if hs_breakdown:
+                by_hs = _reduce(by_hs, rows, HS_KEYS)
+            else:
+                by_country = _reduce(by_country, rows, COUNTRY_KEYS)
+
+    # HS 류별 집계가 있으면 국가별 집계는 그것을 다시 합쳐 얻습니다.
+    if by_hs is not None:
+        by_country = by_hs.groupby(level=COUNTRY_KEYS, sort=False).sum()
+    if by_country is None:
+        return None, None
+    return _finish(by_country), _finish(by_hs) if by_hs is not None else None
+
+
+def _finish(aggregated):
+    """집계 결과에 무역수지를 더하고 정렬된 일반 데이터프레임으로 만듭니다."""
+    df = aggregated.reset_index()
+    df['trade_balance'] = df['export_amount'] - df['import_amount']
+    return df.sort_values(list(aggregated.index.names)).reset_index(drop=True)
+
+
+def _write_csv(df, path):
+    tmp_path = f"{path}.tmp"
+    df.to_csv(tmp_path, index=False, date_format='%Y-%m-%d')
+    os.replace(tmp_path, path)
+
+
+def _read_manifest(state_dir):
+    path = os.path.join(state_dir, MANIFEST)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _write_manifest(state_dir, manifest):
+    path = os.path.join(state_dir, MANIFEST)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def ingest(raw_dir=RAW_DIR, state_dir=STATE_DIR, chunk_rows=CHUNK_ROWS, hs_breakdown=True, force=False):
+    """
+    원본을 월 단위로 집계해 상태 디렉터리에 저장합니다. 원본이 그대로이고 이미 처리된 월은 건너뜁니다.
+    한 달이 끝날 때마다 매니페스트를 갱신하므로, 중간에 중단되어도 다음 실행은 남은 월부터 이어갑니다.
+    반환값은 (처리한 월 목록, 건너뛴 월 목록)입니다.
+    """
+    for sub in ('country', 'hs'):
+        os.makedirs(os.path.join(state_dir, sub), exist_ok=True)
+    manifest = {} if force else _read_manifest(state_dir)
+    processed, skipped = [], []
+
+    for month, paths in discover(raw_dir).items():
+        stamp = {'files': source_stamp(paths), 'hs_breakdown': hs_breakdown}
+        if manifest.get(month) == stamp:
+            skipped.append(month)
+            continue
+
+        by_country, by_hs = aggregate_month(paths, chunk_rows, hs_breakdown)
+        hs_path = os.path.join(state_dir, 'hs', f"{month}.csv")
+        if by_country is not None:
+            _write_csv(by_country, os.path.join(state_dir, 'country', f"{month}.csv"))
+        if by_hs is not None:
+            _write_csv(by_hs, hs_path)
+        elif os.path.exists(hs_path):
+            os.remove(hs_path)
+
+        manifest[month] = stamp
+        _write_manifest(state_dir, manifest)
+        processed.append(month)
+    return processed, skipped
+
+
+def combine(state_dir=STATE_DIR, output=trade_store.TRADE_CSV, hs_output=HS_CSV):
+    """
+    월별 집계를 하나씩 읽어 trade_data.csv(국가별 + '총합')와 HS 류별 CSV로 이어 붙입니다.
+    hs_output이 None이면 HS 류별 CSV는 만들지 않습니다. 한 번에 한 달치만 메모리에 올리며, 반환값은 trade_data.csv에 쓴 행 수입니다.
+    """
+    manifest = _read_manifest(state_dir)
+    n_rows = 0
+    for sub, path in (('country', output), ('hs', hs_output)):
+        if path is None:
+            continue
+        tmp_path = f"{path}.tmp"
+        wrote = False
+        for month in sorted(manifest):
+            part_path = os.path.join(state_dir, sub, f"{month}.csv")
+            if not os.path.exists(part_path):
+                continue
+            part = pd.read_csv(part_path, dtype={'country_name': str, 'hs_chapter': str})
+            if sub == 'country':
+                total = part[SUM_COLUMNS + ['trade_balance']].sum().to_frame().T
+                total.insert(0, 'country_name', trade_store.TOTAL_COUNTRY)
+                total.insert(0, 'Date', part['Date'].iloc[0])
+                part = pd.concat([total, part], ignore_index=True)
+                n_rows += len(part)
+            part.to_csv(tmp_path, mode='a' if wrote else 'w', header=not wrote, index=False)
+            wrote = True
+        if wrote:
+            os.replace(tmp_path, path)
+    return n_rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="관세청 수출입 실적 원본을 국가·월별 집계로 적재합니다.")
+    parser.add_argument('--raw', default=RAW_DIR, help="월별 원본 파일 디렉터리")
+    parser.add_argument('--state', default=STATE_DIR, help="월별 집계와 매니페스트를 둘 디렉터리")
+    parser.add_argument('--output', default=trade_store.TRADE_CSV)
+    parser.add_argument('--store', default=trade_store.TRADE_STORE, help="함께 갱신할 Arrow 저장소 경로")
+    parser.add_argument('--hs-output', default=HS_CSV)
+    parser.add_argument('--no-hs', action='store_true', help="HS 류별 집계를 만들지 않음")
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS)
+    parser.add_argument('--force', action='store_true', help="이미 처리한 월도 다시 처리")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.raw):
+        print(f"원본 디렉터리({args.raw})를 찾을 수 없습니다.")
+        return 1
+    try:
+        processed, skipped = ingest(args.raw, args.state, args.chunk_rows, not args.no_hs, args.force)
+    except ValueError as e:
+        # 이미 끝난 월은 매니페스트에 남아 있으므로, 문제 파일을 고친 뒤 다시 실행하면 이어서 처리합니다.
+        print(e)
+        return 1
+    print(f"처리 {len(processed)}개월, 건너뜀 {len(skipped)}개월")
+    if not processed and os.path.exists(args.output):
+        return 0
+
+    n_rows = combine(args.state, args.output, None if args.no_hs else args.hs_output)
+    if n_rows:
+        trade_store.convert_csv_to_store(args.output, args.store)
+    print(f"{args.output}: {n_rows:,}행")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
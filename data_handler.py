@@ -2,80 +2,80 @@
 
 import streamlit as st
 import pandas as pd
-import numpy as np
-import yfinance as yf
-import os
-from datetime import datetime
+import trade_store
+import metrics_engine
+import kospi_store
+import snapshot
 
-@st.cache_data
-def load_trade_data(filename="trade_data.csv"):
+def load_trade_data(filename=trade_store.TRADE_CSV, store_path=trade_store.TRADE_STORE, countries=None):
     """
     무역 데이터를 로드하고 모든 파생 지표를 계산합니다.
+    [수정] 데이터셋 버전(파일 변경 시각·크기)을 캐시 키에 포함해, 원본이 바뀔 때만 다시 계산합니다.
     """
-    try:
-        trade_df = pd.read_csv(filename)
-    except FileNotFoundError:
+    version = trade_store.dataset_version(filename, store_path)
+    if version is None:
         return None
 
-    trade_df['Date'] = pd.to_datetime(trade_df['Date'])
-    trade_df = trade_df.sort_values(by=['country_name', 'Date']).reset_index(drop=True)
+    # [수정] 원본 체크섬이 일치하는 웜부트 스냅샷이 있으면 파싱과 파생 지표 계산을 모두 건너뜁니다.
+    snapshot_df = _load_trade_snapshot(filename, store_path, version)
+    if snapshot_df is not None:
+        if countries is None:
+            return snapshot_df
+        return snapshot_df[snapshot_df['country_name'].isin(list(countries))].reset_index(drop=True)
 
-    for col in ['export_amount', 'import_amount', 'trade_balance']:
-        trade_df[f'{col}_trailing_12m'] = trade_df.groupby('country_name')[col].rolling(window=12, min_periods=12).sum().reset_index(level=0, drop=True)
-        trade_df[f'{col}_yoy_growth'] = trade_df.groupby('country_name')[col].pct_change(periods=12) * 100
-        trade_df[f'{col}_trailing_12m_yoy_growth'] = trade_df.groupby('country_name')[f'{col}_trailing_12m'].pct_change(periods=12) * 100
+    return _load_trade_data(filename, store_path, tuple(countries) if countries is not None else None, version)
 
-    trade_df.replace([np.inf, -np.inf], np.nan, inplace=True)
-    return trade_df
+@st.cache_resource(max_entries=1)
+def _load_trade_snapshot(filename, store_path, version):
+    """
+    스냅샷을 프로세스당 한 번만 읽기 전용으로 메모리 매핑합니다.
+    st.cache_data와 달리 복사본을 만들지 않으므로 워커 프로세스들이 같은 페이지를 공유합니다.
+    """
+    return snapshot.load_trade_snapshot(filename, store_path)
 
 @st.cache_data
-def get_and_update_kospi_data(filename="kospi200.csv"):
+def _load_trade_data(filename, store_path, countries, version):
     """
-    KOSPI 200 데이터를 관리하며, 성공 시에는 메시지를 반환하지 않습니다.
+    [수정] 변환된 컬럼형 저장소가 있으면 메모리 매핑으로 읽고, 없을 때만 CSV를 파싱합니다.
+    파생 지표는 metrics_engine에서 국가 × 월 배열로 한 번에 계산합니다.
     """
-    today = pd.Timestamp.now().strftime('%Y-%m-%d')
-    ticker = yf.Ticker("^KS200")
+    derived_df, source_version = trade_store.read_derived_store(countries=countries)
+    if derived_df is not None and source_version == version:
+        return derived_df
 
-    if not os.path.exists(filename):
-        try:
-            hist_daily = ticker.history(start='1991-01-01', end=today, interval="1d").reset_index()
-            if hist_daily.empty:
-                return None, "KOSPI 데이터 다운로드에 실패했습니다. 티커나 인터넷 연결을 확인해주세요."
-            
-            hist_daily['Date'] = pd.to_datetime(hist_daily['Date']).dt.tz_localize(None)
-            hist_daily.to_csv(filename, index=False)
-            return hist_daily, None  # [수정] 성공 시 메시지 없음
-        except Exception as e:
-            return None, f"KOSPI 데이터 다운로드 중 오류 발생: {e}"
+    trade_df = trade_store.load_trade_frame(filename, store_path, countries=countries)
+    if trade_df is None:
+        return None
+    return metrics_engine.add_derived_metrics(trade_df)
 
-    existing_df = pd.read_csv(filename)
-    existing_df['Date'] = pd.to_datetime(existing_df['Date']).dt.tz_localize(None)
-    last_date_in_file = existing_df['Date'].max()
+@st.cache_resource
+def get_kospi_refresher(filename=kospi_store.KOSPI_CSV):
+    """
+    프로세스 전체에서 공유하는 KOSPI 갱신기를 생성하고 주기적 갱신을 시작합니다.
+    모든 세션이 같은 인스턴스를 사용하므로 동시에 들어온 갱신 요청은 한 번만 실행됩니다.
+    """
+    refresher = kospi_store.KospiRefresher(kospi_store.YFinanceSource(), kospi_store.KospiStore(filename))
+    refresher.seed(snapshot.load_kospi_snapshot(filename))
+    refresher.start()
+    return refresher
 
-    if last_date_in_file.date() < pd.Timestamp.now().date():
-        start_for_update = (last_date_in_file + pd.Timedelta(days=1)).strftime('%Y-%m-%d')
-        try:
-            new_data = ticker.history(start=start_for_update, end=today, interval="1d").reset_index()
-            if not new_data.empty:
-                new_data['Date'] = pd.to_datetime(new_data['Date']).dt.tz_localize(None)
-                updated_df = pd.concat([existing_df, new_data]).drop_duplicates(subset=['Date'], keep='last')
-                updated_df.to_csv(filename, index=False)
-                return updated_df, None  # [수정] 성공 시 메시지 없음
-            else:
-                return existing_df, None  # [수정] 성공 시 메시지 없음
-        except Exception as e:
-            return existing_df, f"KOSPI 데이터 업데이트 중 오류 발생: {e} (기존 데이터를 사용합니다.)"
-    else:
-        return existing_df, None  # [수정] 성공 시 메시지 없음
+def get_and_update_kospi_data(filename=kospi_store.KOSPI_CSV):
+    """
+    KOSPI 200 데이터를 관리하며, 성공 시에는 메시지를 반환하지 않습니다.
+    [수정] 마지막으로 성공한 데이터를 즉시 반환하고, 오래된 경우 백그라운드에서 갱신합니다.
+    """
+    return get_kospi_refresher(filename).get()
+
+def trade_data_version(filename=trade_store.TRADE_CSV, store_path=trade_store.TRADE_STORE):
+    """무역 원본(CSV 또는 저장소)이 바뀔 때마다 달라지는 버전 문자열로, 캐시 키에 사용합니다."""
+    return trade_store.dataset_version(filename, store_path)
+
+def kospi_data_version(filename=kospi_store.KOSPI_CSV):
+    """KOSPI 데이터가 갱신될 때마다 증가하는 버전 번호로, 캐시 키에 사용합니다."""
+    return get_kospi_refresher(filename).version
 
 def process_kospi_for_chart(daily_df):
     """
     일별 KOSPI 데이터를 월말(Month-End) 기준 월별 데이터로 전처리합니다.
     """
-    if daily_df is None:
-        return None
-    kospi_monthly = daily_df.copy()
-    kospi_monthly['Date'] = pd.to_datetime(kospi_monthly['Date'])
-    # [수정] 월초('MS') 기준 -> 월말('M') 기준으로 변경
-    kospi_monthly = kospi_monthly.set_index('Date').resample('M').last().reset_index()
-    return kospi_monthly[['Date', 'Close']].rename(columns={'Close': 'kospi_price'})
+    return kospi_store.to_monthly(daily_df)
@@ -0,0 +1,56 @@
+# data_loader.py
+
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+MAX_WORKERS = 4
+
+_EXECUTOR = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='data-loader')
+
+
+class BackgroundTask:
+    """
+    함수를 공유 스레드 풀에서 한 번만 실행합니다.
+    여러 세션이 같은 작업을 공유하며, 결과를 기다리거나 완료 여부만 확인할 수 있습니다.
+    """
+
+    def __init__(self, func, *args):
+        self.started_at = time.monotonic()
+        self.finished_at = None
+        self._future = _EXECUTOR.submit(self._run, func, *args)
+
+    def _run(self, func, *args):
+        try:
+            return func(*args)
+        finally:
+            self.finished_at = time.monotonic()
+
+    def done(self) -> bool:
+        return self._future.done()
+
+    def wait(self, timeout: float = None) -> bool:
+        """timeout(초) 안에 작업이 끝나면 True를 반환합니다. None이면 끝날 때까지 기다립니다."""
+        try:
+            self._future.exception(timeout=timeout)
+        except FutureTimeout:
+            return False
+        return True
+
+    def result(self):
+        """작업 결과를 반환합니다. 작업 중 예외가 발생했다면 그 예외를 다시 발생시킵니다."""
+        return self._future.result()
+
+    @property
+    def seconds(self):
+        """작업에 걸린 시간(초). 아직 끝나지 않았으면 None입니다."""
+        return None if self.finished_at is None else self.finished_at - self.started_at
+
+
+class Deadline:
+    """여러 대기 단계가 나눠 쓰는 시간 예산(초)."""
+
+    def __init__(self, seconds: float):
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
@@ -0,0 +1,204 @@
+# kospi_store.py
+
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+import pandas as pd
+
+KOSPI_CSV = "kospi200.csv"
+KOSPI_TICKER = "^KS200"
+HISTORY_START = '1991-01-01'
+REFRESH_INTERVAL = 60 * 60  # 초 단위 (1시간)
+
+
+def to_monthly(daily_df):
+    """
+    일별 KOSPI 데이터를 월말(Month-End) 기준 월별 데이터로 전처리합니다.
+    """
+    if daily_df is None:
+        return None
+    kospi_monthly = daily_df[['Date', 'Close']].copy()
+    kospi_monthly['Date'] = pd.to_datetime(kospi_monthly['Date'])
+    # [수정] 월초('MS') 기준 -> 월말('ME') 기준으로 변경
+    kospi_monthly = kospi_monthly.set_index('Date').resample('ME').last().reset_index()
+    return kospi_monthly.rename(columns={'Close': 'kospi_price'})
+
+
+class KospiSource(ABC):
+    """
+    KOSPI 200 일별 시세 공급원 인터페이스.
+    fetch(start, end)는 [start, end) 구간의 행을 타임존 없는 'Date' 열과 함께 반환해야 합니다.
+    """
+
+    @abstractmethod
+    def fetch(self, start: str, end: str) -> pd.DataFrame:
+        ...
+
+
+class YFinanceSource(KospiSource):
+    """yfinance(Yahoo Finance)에서 시세를 받아오는 기본 공급원."""
+
+    def __init__(self, ticker: str = KOSPI_TICKER):
+        self.ticker = ticker
+
+    def fetch(self, start: str, end: str) -> pd.DataFrame:
+        import yfinance as yf
+        hist = yf.Ticker(self.ticker).history(start=start, end=end, interval="1d").reset_index()
+        if not hist.empty:
+            hist['Date'] = pd.to_datetime(hist['Date']).dt.tz_localize(None)
+        return hist
+
+
+class FrameSource(KospiSource):
+    """
+    미리 준비한 데이터프레임에서 시세를 잘라 반환하는 로컬 공급원.
+    네트워크 없이 테스트나 오프라인 실행에 사용합니다.
+    """
+
+    def __init__(self, daily_df: pd.DataFrame):
+        self.daily_df = daily_df
+        self.calls = 0
+
+    def fetch(self, start: str, end: str) -> pd.DataFrame:
+        self.calls += 1
+        dates = self.daily_df['Date']
+        mask = (dates >= pd.Timestamp(start)) & (dates < pd.Timestamp(end))
+        return self.daily_df[mask].reset_index(drop=True)
+
+
+class KospiStore:
+    """
+    추가 전용(append-only) CSV 로그.
+    기존 행은 다시 쓰지 않고, 마지막 날짜 이후의 행만 파일 끝에 덧붙입니다.
+    """
+
+    def __init__(self, filename: str = KOSPI_CSV):
+        self.filename = filename
+
+    def read(self):
+        if not os.path.exists(self.filename):
+            return None
+        daily_df = pd.read_csv(self.filename)
+        daily_df['Date'] = pd.to_datetime(daily_df['Date']).dt.tz_localize(None)
+        return daily_df
+
+    def append(self, new_rows: pd.DataFrame, after=None) -> pd.DataFrame:
+        """after 이후의 행만 추가하고, 실제로 추가된 행을 반환합니다."""
+        if after is not None:
+            new_rows = new_rows[new_rows['Date'] > after]
+        if new_rows.empty:
+            return new_rows
+        exists = os.path.exists(self.filename)
+        if exists:
+            new_rows = new_rows.reindex(columns=pd.read_csv(self.filename, nrows=0).columns)
+        new_rows.to_csv(self.filename, mode='a', header=not exists, index=False)
+        return new_rows
+
+
+class KospiRefresher:
+    """
+    마지막으로 성공한 KOSPI 데이터를 즉시 제공하고(stale-while-revalidate), 갱신은 백그라운드에서 수행합니다.
+    하나의 인스턴스를 여러 세션이 공유하면 동시에 요청된 갱신은 한 번만 실행됩니다.
+    """
+
+    def __init__(self, source: KospiSource, store: KospiStore, interval: float = REFRESH_INTERVAL):
+        self.source = source
+        self.store = store
+        self.interval = interval
+        self.version = 0
+        self._generation = 0  # 완료된 갱신 횟수. 동시에 요청된 갱신을 하나로 합치는 데 씁니다.
+        self._data = None
+        self._message = None
+        self._checked_at = None
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def get(self):
+        """
+        (데이터, 메시지)를 반환합니다. 데이터가 아예 없을 때만 갱신을 기다리고,
+        오래된 데이터는 그대로 반환하면서 백그라운드 갱신을 시작합니다.
+        """
+        if self._data is None and self._checked_at is None:
+            self.refresh()
+        elif self.is_stale():
+            self.refresh_async()
+        return self._data, self._message
+
+    def seed(self, data):
+        """
+        아직 데이터가 없을 때 초기 데이터(예: 웜부트 스냅샷)를 넣어 둡니다.
+        첫 get()은 이 데이터를 바로 반환하고 갱신은 백그라운드에서 진행합니다.
+        """
+        if data is not None and self._data is None:
+            self._data = data
+
+    def is_stale(self) -> bool:
+        return self._checked_at is None or time.monotonic() - self._checked_at >= self.interval
+
+    def refresh(self, blocking: bool = True) -> bool:
+        """
+        갱신을 한 번 수행합니다. 다른 갱신이 진행 중이면 그 결과를 공유하고 새로 실행하지 않습니다.
+        blocking=False이면 진행 중인 갱신이 있을 때 기다리지 않고 바로 반환합니다.
+        [수정] 데이터가 실제로 바뀐 경우에만 version을 올려, 변경 없는 주기적 갱신이 화면 캐시를 무효화하지 않게 합니다.
+        """
+        started_generation = self._generation
+        if not self._refresh_lock.acquire(blocking=blocking):
+            return False
+        try:
+            if self._generation != started_generation:
+                return True
+            if self._refresh():
+                self.version += 1
+            self._generation += 1
+            return True
+        finally:
+            self._refresh_lock.release()
+
+    def refresh_async(self):
+        if not self._refresh_lock.locked():
+            threading.Thread(target=self.refresh, kwargs={'blocking': False}, daemon=True).start()
+
+    def start(self):
+        """주기적으로 갱신하는 데몬 스레드를 시작합니다."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.refresh(blocking=False)
+
+    def _refresh(self) -> bool:
+        """원본을 확인해 새 행을 반영하고, 보관 중인 데이터가 바뀌었으면 True를 반환합니다."""
+        previous = self._data
+        data = self._data if self._data is not None else self.store.read()
+        today = pd.Timestamp.now().normalize()
+        message = None
+        try:
+            if data is None or data.empty:
+                fetched = self.source.fetch(HISTORY_START, today.strftime('%Y-%m-%d'))
+                if fetched.empty:
+                    message = "KOSPI 데이터 다운로드에 실패했습니다. 티커나 인터넷 연결을 확인해주세요."
+                else:
+                    data = self.store.append(fetched).reset_index(drop=True)
+            else:
+                last_date = data['Date'].max()
+                start = last_date.normalize() + pd.Timedelta(days=1)
+                if start < today:
+                    fetched = self.source.fetch(start.strftime('%Y-%m-%d'), today.strftime('%Y-%m-%d'))
+                    added = self.store.append(fetched, after=last_date)
+                    if not added.empty:
+                        data = pd.concat([data, added], ignore_index=True)
+        except Exception as e:
+            if data is None:
+                message = f"KOSPI 데이터 다운로드 중 오류 발생: {e}"
+            else:
+                message = f"KOSPI 데이터 업데이트 중 오류 발생: {e} (기존 데이터를 사용합니다.)"
+
+        self._data, self._message, self._checked_at = data, message, time.monotonic()
+        return data is not previous
@@ -0,0 +1,287 @@
+# metrics_engine.py
+
+import numpy as np
+import pandas as pd
+
+from trade_store import AMOUNT_COLUMNS
+
+DERIVED_SUFFIXES = ['_trailing_12m', '_yoy_growth', '_trailing_12m_yoy_growth']
+WINDOW = 12
+
+
+def derived_columns(columns=AMOUNT_COLUMNS):
+    """기본 지표마다 생성되는 파생 열 이름 목록을 반환합니다."""
+    return [f"{col}{suffix}" for col in columns for suffix in DERIVED_SUFFIXES]
+
+
+def month_index(dates):
+    """날짜를 달력 기준 정수 월 인덱스(year * 12 + month)로 변환합니다."""
+    # .dt.year/.dt.month보다 datetime64[M] 변환이 훨씬 빠릅니다 (1970년 1월 = 1970 * 12 + 1).
+    return dates.to_numpy().astype('datetime64[M]').astype('int64') + (1970 * 12 + 1)
+
+
+def dense_grid(trade_df):
+    """
+    각 행의 (국가 코드, 월 인덱스)를 계산합니다.
+    월 인덱스는 데이터의 첫 달을 0으로 하는 달력 기준 정수입니다.
+    """
+    countries = trade_df['country_name'].astype('category')
+    codes = countries.cat.codes.to_numpy()
+    periods = month_index(trade_df['Date'])
+    months = periods - periods.min()
+    return codes, months, len(countries.cat.categories), int(months.max()) + 1
+
+
+def to_dense(trade_df, columns=AMOUNT_COLUMNS):
+    """지정한 열들을 (지표 × 국가 × 월) 밀집 배열로 바꿉니다. 값이 없는 칸은 NaN입니다."""
+    codes, months, n_countries, n_months = dense_grid(trade_df)
+    dense = np.full((len(columns), n_countries, n_months), np.nan)
+    dense[:, codes, months] = trade_df[columns].to_numpy(dtype='float64').T
+    return dense, codes, months
+
+
+def trailing_sum(dense, window=WINDOW):
+    """
+    누적합 차분으로 마지막 축의 이동 합계를 구합니다.
+    창 안에 결측치가 하나라도 있으면 NaN입니다 (rolling(min_periods=window)과 동일).
+    """
+    valid = ~np.isnan(dense)
+    pad = [(0, 0)] * (dense.ndim - 1) + [(1, 0)]
+    csum = np.pad(np.cumsum(np.where(valid, dense, 0.0), axis=-1), pad)
+    ccount = np.pad(np.cumsum(valid, axis=-1), pad)
+    out = np.full(dense.shape, np.nan)
+    out[..., window - 1:] = csum[..., window:] - csum[..., :-window]
+    full = np.zeros(dense.shape, dtype=bool)
+    full[..., window - 1:] = (ccount[..., window:] - ccount[..., :-window]) == window
+    out[~full] = np.nan
+    return out
+
+
+def pct_change(dense, periods=WINDOW):
+    """마지막 축 기준 periods 간격의 변화율(%)을 구하며, 0으로 나눈 값은 NaN으로 처리합니다."""
+    out = np.full(dense.shape, np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out[..., periods:] = (dense[..., periods:] / dense[..., :-periods] - 1) * 100
+    out[~np.isfinite(out)] = np.nan
+    return out
+
+
+def compute_dense_metrics(dense):
+    """
+    (지표 × 국가 × 월) 배열 하나로 세 가지 파생 지표를 한 번에 계산합니다.
+    반환 순서는 DERIVED_SUFFIXES와 같습니다.
+    """
+    trailing = trailing_sum(dense)
+    return trailing, pct_change(dense), pct_change(trailing)
+
+
+def add_derived_metrics(trade_df, columns=AMOUNT_COLUMNS):
+    """
+    국가 × 월 밀집 배열로 재구성한 뒤 모든 파생 지표를 한 번에 계산해 열로 추가합니다.
+    국가 수가 늘어나도 파이썬 반복 없이 배열 연산만 수행합니다.
+    """
+    trade_df = trade_df.copy()
+    if trade_df.empty:
+        for col in derived_columns(columns):
+            trade_df[col] = pd.Series(dtype='float64')
+        return trade_df
+
+    dense, codes, months = to_dense(trade_df, columns)
+    results = compute_dense_metrics(dense)
+    for i, col in enumerate(columns):
+        for suffix, values in zip(DERIVED_SUFFIXES, results):
+            trade_df[f"{col}{suffix}"] = values[i, codes, months]
+    return trade_df
+
+
+def _aligned_keys(derived_df, source_df):
+    """
+    두 데이터프레임의 (국가, 날짜)를 같은 국가 코드 체계의 정수 키(국가 코드 × 일 수 + 날짜)로 바꿉니다.
+    문자열 MultiIndex 없이 정수 배열만 비교하므로 행 수에 비례하는 배열 연산 몇 번으로 끝납니다.
+    반환값은 (derived 키, 국가 코드, 일), (source 키, 국가 코드, 일), 국가 수이며 '일'은 1970-01-01부터의 일 수입니다.
+    """
+    d_names = derived_df['country_name'].astype('category')
+    s_names = source_df['country_name'].astype('category')
+    categories = d_names.cat.categories.union(s_names.cat.categories)
+    d_codes = d_names.cat.set_categories(categories).cat.codes.to_numpy().astype('int64')
+    s_codes = s_names.cat.set_categories(categories).cat.codes.to_numpy().astype('int64')
+    # 월 인덱스보다 일 단위 변환이 훨씬 빠르므로, 키는 일 단위로 만들고 월은 꼬리 구간에서만 계산합니다.
+    d_days = derived_df['Date'].to_numpy().astype('datetime64[D]').astype('int64')
+    s_days = source_df['Date'].to_numpy().astype('datetime64[D]').astype('int64')
+    base = min(d_days.min(), s_days.min())
+    span = max(d_days.max(), s_days.max()) - base + 1
+    return (d_codes * span + (d_days - base), d_codes, d_days), (s_codes * span + (s_days - base), s_codes, s_days), len(categories)
+
+
+def _take_columns(df, columns, index):
+    """지정한 열들에서 index 행을 골라 (열 × 행) float64 배열로 반환합니다. 열마다 따로 골라 블록 병합 비용을 피합니다."""
+    out = np.empty((len(columns), len(index)))
+    for i, col in enumerate(columns):
+        np.take(df[col].to_numpy(dtype='float64'), index, out=out[i])
+    return out
+
+
+def _days_to_months(days):
+    """1970-01-01부터의 일 수를 month_index()와 같은 정수 월 인덱스로 바꿉니다."""
+    return days.astype('datetime64[D]').astype('datetime64[M]').astype('int64') + (1970 * 12 + 1)
+
+
+def _months_to_days(months):
+    """정수 월 인덱스를 그 달 1일의 일 수로 바꿉니다."""
+    return (months - (1970 * 12 + 1)).astype('datetime64[M]').astype('datetime64[D]').astype('int64')
+
+
+def update_derived_metrics(derived_df, source_df, columns=AMOUNT_COLUMNS):
+    """
+    이전 파생 데이터와 현재 원본을 비교해, 국가별로 새로 생기거나 값이 수정·삭제된 가장 이른 달부터의 꼬리 구간만 다시 계산합니다.
+    각 파생 값은 최대 직전 24개월(2 × WINDOW)에만 의존하므로, 꼬리 시작 23개월 전부터를 계산 구간으로 잡습니다.
+    그보다 앞선 행의 파생 값은 이전 결과에서 그대로 가져옵니다. 반환값은 (원본 행 순서의 파생 데이터, 변경된 행 수)입니다.
+    수정·삭제를 찾으려면 기본 지표를 한 번 훑어야 하지만, 정렬·병합·파생 지표 계산은 꼬리 구간에만 합니다.
+    """
+    if derived_df.empty or source_df.empty:
+        return add_derived_metrics(source_df, columns), max(len(source_df), len(derived_df))
+
+    (d_keys, d_codes, d_days), (s_keys, s_codes, s_days), n_countries = _aligned_keys(derived_df, source_df)
+    # 저장된 파생 데이터는 보통 (국가, 날짜) 순으로 정렬되어 있으므로, 그럴 때는 정렬을 건너뜁니다.
+    order = None if np.all(d_keys[1:] > d_keys[:-1]) else np.argsort(d_keys, kind='stable')
+    if order is not None:
+        d_keys, d_codes, d_days = d_keys[order], d_codes[order], d_days[order]
+
+    pos = np.minimum(np.searchsorted(d_keys, s_keys), len(d_keys) - 1)
+    found = d_keys[pos] == s_keys
+    d_index = pos if order is None else order[pos]
+    # 값 배열은 (열 × 행) 방향으로 다루고, 비트 단위로 비교하므로 NaN끼리도 같다고 봅니다.
+    # 0.0과 -0.0처럼 비트만 다른 값은 다시 계산될 뿐 결과는 같습니다.
+    old = _take_columns(derived_df, columns, d_index)
+    new = source_df[columns].to_numpy(dtype='float64').T
+    same = found & (old.view('int64') == new.view('int64')).all(axis=0)
+    kept = np.zeros(len(d_keys), dtype=bool)
+    kept[pos[found]] = True
+    n_changed = int((~same).sum() + (~kept).sum())
+    if n_changed == 0:
+        return derived_df, 0
+
+    # 국가별 꼬리 시작: 바뀐 원본 행과 사라진 기존 행 중 가장 이른 날짜가 속한 달의 1일
+    never = np.iinfo('int64').max
+    start = np.full(n_countries, never)
+    np.minimum.at(start, s_codes[~same], s_days[~same])
+    np.minimum.at(start, d_codes[~kept], d_days[~kept])
+    touched = start < never
+    start_month = _days_to_months(start[touched])
+    tail_from, context_from = np.full(n_countries, never), np.full(n_countries, never)
+    tail_from[touched] = _months_to_days(start_month)
+    context_from[touched] = _months_to_days(start_month - (2 * WINDOW - 1))
+    affected = s_days >= tail_from[s_codes]
+    context = s_days >= context_from[s_codes]
+
+    # 꼬리 앞쪽 행은 키와 값이 모두 같으므로 이전 파생 값을 그대로 쓰고, 꼬리 행만 아래에서 덮어씁니다.
+    value_cols = derived_columns(columns)
+    values = _take_columns(derived_df, value_cols, d_index)
+
+    # 꼬리가 있는 국가의 계산 구간만 (지표 × 국가 × 월) 배열로 옮겨 다시 계산합니다.
+    ctx_codes, ctx_rows = np.unique(s_codes[context], return_inverse=True)
+    ctx_months = _days_to_months(s_days[context])
+    first = ctx_months.min()
+    dense = np.full((len(columns), len(ctx_codes), ctx_months.max() - first + 1), np.nan)
+    dense[:, ctx_rows, ctx_months - first] = new[:, context]
+    results = compute_dense_metrics(dense)
+    tail = affected[context]
+    rows, months = ctx_rows[tail], ctx_months[tail] - first
+    values[:, affected] = np.stack([result[i, rows, months] for i in range(len(columns)) for result in results])
+
+    derived = pd.DataFrame(values.T, columns=value_cols, index=source_df.index, copy=False)
+    return pd.concat([source_df[['Date', 'country_name'] + columns], derived], axis=1), n_changed
+
+
+def matches_full_recompute(derived_df, source_df, columns=AMOUNT_COLUMNS):
+    """증분 계산 결과가 원본 전체를 다시 계산한 결과와 (기본 지표와 파생 지표 모두) 같은지 확인합니다."""
+    def ordered(df):
+        df = df.assign(country_name=df['country_name'].astype(str))
+        return df.sort_values(by=['country_name', 'Date']).reset_index(drop=True)
+
+    full = ordered(add_derived_metrics(source_df, columns))
+    derived_df = ordered(derived_df)
+    if len(full) != len(derived_df) or not full[['Date', 'country_name']].equals(derived_df[['Date', 'country_name']]):
+        return False
+    value_cols = columns + derived_columns(columns)
+    return np.allclose(derived_df[value_cols].to_numpy(dtype='float64'), full[value_cols].to_numpy(dtype='float64'), equal_nan=True)
+
+
+def pct_delta(current, previous):
+    """(현재 - 이전) / |이전| × 100. 이전 값이 없거나 0이면 NaN입니다."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        delta = (current - previous) / np.abs(previous) * 100
+    return np.where(np.isfinite(delta), delta, np.nan)
+
+
+def latest_summary(trade_df, columns=AMOUNT_COLUMNS, anchor='export_amount'):
+    """
+    국가별 최신 월(anchor 값이 있는 마지막 달)의 값, 전월·전년 동월 값과 전월·전년 대비 증감률(%)을
+    모든 국가에 대해 한 번에 계산합니다. 열 이름은 '<지표>', '<지표>_prev_month', '<지표>_prev_year',
+    '<지표>_mom', '<지표>_yoy'(증감률), '<지표>_mom_change', '<지표>_yoy_change'(증감액) 형식입니다.
+    """
+    countries = trade_df['country_name'].astype('category')
+    if trade_df.empty:
+        return pd.DataFrame(columns=['country_name', 'Date'] + columns)
+
+    dense, codes, months = to_dense(trade_df, columns)
+    n_countries, n_months = dense.shape[1:]
+    date_grid = np.full((n_countries, n_months), np.datetime64('NaT'), dtype=trade_df['Date'].dtype)
+    date_grid[codes, months] = trade_df['Date'].to_numpy()
+
+    valid = ~np.isnan(dense[columns.index(anchor)])
+    latest = n_months - 1 - np.argmax(valid[:, ::-1], axis=1)
+    rows = np.arange(n_countries)
+
+    def values_at(offset):
+        idx = latest - offset
+        out = np.full((len(columns), n_countries), np.nan)
+        ok = idx >= 0
+        out[:, ok] = dense[:, rows[ok], idx[ok]]
+        return out
+
+    current, prev_month, prev_year = values_at(0), values_at(1), values_at(WINDOW)
+    summary = pd.DataFrame({'country_name': countries.cat.categories, 'Date': date_grid[rows, latest]})
+    for i, col in enumerate(columns):
+        summary[col] = current[i]
+        summary[f"{col}_prev_month"] = prev_month[i]
+        summary[f"{col}_prev_year"] = prev_year[i]
+        summary[f"{col}_mom"] = pct_delta(current[i], prev_month[i])
+        summary[f"{col}_yoy"] = pct_delta(current[i], prev_year[i])
+        summary[f"{col}_mom_change"] = current[i] - prev_month[i]
+        summary[f"{col}_yoy_change"] = current[i] - prev_year[i]
+    return summary[valid.any(axis=1)].reset_index(drop=True)
+
+
+class MetricsIndex:
+    """
+    국가별 최신 월 지표 색인. 데이터셋 버전당 한 번 만들고, 국가별 조회는 딕셔너리로 O(1)입니다.
+    """
+
+    def __init__(self, trade_df, columns=AMOUNT_COLUMNS):
+        self.summary = latest_summary(trade_df, columns)
+        self._records = {record['country_name']: record for record in self.summary.to_dict(orient='records')}
+
+    def get(self, country, start=None, end=None):
+        """
+        해당 국가의 최신 월 지표(dict)를 반환합니다. 조회 기간이 최신 월과 그 전년 동월을 모두 포함하지 않으면
+        색인 값이 기간 안의 값과 달라질 수 있으므로 None을 반환합니다.
+        """
+        record = self._records.get(country)
+        if record is None:
+            return None
+        latest = record['Date']
+        if end is not None and latest > pd.Timestamp(end):
+            return None
+        if start is not None and latest - pd.DateOffset(months=WINDOW) < pd.Timestamp(start):
+            return None
+        return record
+
+
+def top_movers(summary, sort_column, n=10, exclude=()):
+    """
+    sort_column 기준 상승 상위 n개국과 하락 상위 n개국을 (상승, 하락) 순으로 반환합니다.
+    전체 국가를 한 번에 정렬하는 벡터 연산입니다.
+    """
+    ranked = summary[~summary['country_name'].isin(list(exclude))].dropna(subset=[sort_column])
+    return ranked.nlargest(n, sort_column), ranked.nsmallest(n, sort_column)
@@ -0,0 +1,120 @@
+# profiling.py
+
+import json
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict, deque
+from contextlib import contextmanager, nullcontext
+import numpy as np
+
+PROFILE_ENV = "DASHBOARD_PROFILE"
+PROFILE_LOG_ENV = "DASHBOARD_PROFILE_LOG"
+DEFAULT_LOG_PATH = "profile.jsonl"
+HISTORY_SIZE = 1000  # 단계별로 보관하는 최근 측정값 개수
+PERCENTILES = [50, 95, 99]
+
+_NULL_STAGE = nullcontext()
+
+
+def enabled_by_env() -> bool:
+    return os.environ.get(PROFILE_ENV, '').lower() in ('1', 'true', 'yes')
+
+
+def query_allowed_by_env() -> bool:
+    """
+    DASHBOARD_PROFILE=allow이면 요청별(?debug=1) 프로파일링을 허용합니다.
+    그 밖에는 방문자가 쿼리 파라미터로 프로파일링을 켜 로그 파일을 키울 수 없습니다.
+    """
+    return os.environ.get(PROFILE_ENV, '').lower() == 'allow'
+
+
+class StageStats:
+    """프로세스 전체에서 단계별 최근 소요 시간(ms)을 모아 백분위수를 계산합니다."""
+
+    def __init__(self, size: int = HISTORY_SIZE):
+        self._samples = defaultdict(lambda: deque(maxlen=size))
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, ms: float):
+        with self._lock:
+            self._samples[stage].append(ms)
+
+    def summary(self) -> dict:
+        """{단계: {'count', 'p50', 'p95', 'p99'}} 형태로 반환합니다."""
+        with self._lock:
+            samples = {stage: np.fromiter(values, dtype=float) for stage, values in self._samples.items()}
+        return {
+            stage: {'count': len(values), **{f"p{p}": float(v) for p, v in zip(PERCENTILES, np.percentile(values, PERCENTILES))}}
+            for stage, values in samples.items() if len(values)
+        }
+
+
+STATS = StageStats()
+_log_lock = threading.Lock()
+
+
+class RunProfile:
+    """
+    한 번의 재실행(rerun)에서 단계별 소요 시간, 캐시 적중 여부, 데이터프레임 메모리 사용량을 기록합니다.
+    비활성화 상태에서는 모든 메서드가 아무 일도 하지 않으므로 부담이 거의 없습니다.
+    """
+
+    def __init__(self, session_id: str, enabled: bool = False, log_path: str = None):
+        self.session_id = session_id
+        self.enabled = enabled
+        self.log_path = log_path or os.environ.get(PROFILE_LOG_ENV, DEFAULT_LOG_PATH)
+        self.run_id = uuid.uuid4().hex[:12]
+        self.stages = {}
+        self.marks = {}
+        self._started = time.perf_counter()
+
+    def stage(self, name: str):
+        """with 블록의 소요 시간을 name 단계로 기록합니다."""
+        if not self.enabled:
+            return _NULL_STAGE
+        return self._timed(name)
+
+    @contextmanager
+    def _timed(self, name: str):
+        record = self.stages.setdefault(name, {})
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record['ms'] = (time.perf_counter() - start) * 1000
+            STATS.add(name, record['ms'])
+
+    def cache(self, name: str, hit: bool):
+        """캐시 적중 여부를 기록합니다. 나중에 기록한 값이 우선합니다."""
+        if self.enabled:
+            self.stages.setdefault(name, {})['cache'] = 'hit' if hit else 'miss'
+
+    def frame(self, name: str, *frames):
+        """단계에서 다룬 데이터프레임들의 메모리 사용량(바이트)을 기록합니다."""
+        if self.enabled:
+            self.stages.setdefault(name, {})['bytes'] = int(sum(df.memory_usage(index=True).sum() for df in frames if df is not None))
+
+    def mark(self, name: str):
+        """재실행 시작부터 지금까지의 경과 시간(ms)을 name 시점으로 기록합니다 (예: 첫 화면 표시)."""
+        if self.enabled and name not in self.marks:
+            self.marks[name] = (time.perf_counter() - self._started) * 1000
+
+    def finish(self) -> dict:
+        """재실행 전체 소요 시간을 기록하고, JSON-lines 로그에 한 줄을 추가합니다."""
+        if not self.enabled:
+            return None
+        total_ms = (time.perf_counter() - self._started) * 1000
+        STATS.add('total', total_ms)
+        record = {
+            'ts': time.time(),
+            'session_id': self.session_id,
+            'run_id': self.run_id,
+            'total_ms': total_ms,
+            'stages': self.stages,
+            'marks': self.marks,
+        }
+        with _log_lock, open(self.log_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        return record
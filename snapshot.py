@@ -0,0 +1,272 @@
+# snapshot.py
+"""
+전처리가 끝난 무역·KOSPI 데이터를 파일 하나에 저장해 두는 웜부트(warm-boot) 스냅샷.
+
+    python snapshot.py                  # 원본이 바뀌었을 때만 스냅샷을 다시 만듦
+    python snapshot.py --verify         # 증분 갱신한 파생 지표를 전체 재계산 결과와 비교한 뒤 만듦
+    python snapshot.py measure -n 4     # 워커 4개 기준 첫 화면까지의 시간과 RSS를 스냅샷 유무로 비교
+
+모든 워커 프로세스는 같은 파일을 읽기 전용으로 메모리 매핑하므로, 운영체제가 페이지를 공유합니다.
+배포 환경에서는 빌드 단계(bin/post_compile)에서 한 번 만들어 슬러그에 포함하고, 웹 프로세스는 읽기만 합니다.
+파생 지표는 파생 저장소(trade_data_derived.arrow)를 증분 갱신해 얻으므로, 새 달이 붙으면 그 꼬리 구간만 계산합니다.
+"""
+
+import hashlib
+import json
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+import trade_store
+import metrics_engine
+import kospi_store
+
+SNAPSHOT_PATH = "dashboard.snapshot"
+MAGIC = b'TRDSNAP1'
+ALIGN = 64
+PREAMBLE_SIZE = 64
+
+
+def file_checksum(path):
+    """파일 내용의 SHA-256 값을 반환합니다. 파일이 없으면 None입니다."""
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        return hashlib.file_digest(f, 'sha256').hexdigest()
+
+
+def source_stamp(path):
+    """원본 파일의 (크기, 수정 시각, 체크섬)입니다. 체크섬은 크기나 수정 시각이 다를 때만 비교합니다."""
+    if not os.path.exists(path):
+        return None
+    stat = os.stat(path)
+    return {'path': os.path.basename(path), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': file_checksum(path)}
+
+
+def stamp_matches(stamp, path):
+    """스냅샷에 기록된 원본 정보가 현재 파일과 같은지 확인합니다."""
+    if stamp is None or not os.path.exists(path) or stamp['path'] != os.path.basename(path):
+        return False
+    stat = os.stat(path)
+    if stat.st_size == stamp['size'] and stat.st_mtime_ns == stamp['mtime_ns']:
+        return True
+    return file_checksum(path) == stamp['sha256']
+
+
+def trade_source_path(csv_path=trade_store.TRADE_CSV, store_path=trade_store.TRADE_STORE):
+    """
+    실제로 읽게 될 무역 데이터 원본 경로 (CSV보다 오래되지 않은 저장소가 우선).
+    CSV가 저장소보다 새로우면 CSV가 원본이므로, 저장소 기준으로 만든 스냅샷은 더 이상 일치하지 않습니다.
+    """
+    return trade_store.source_path(csv_path, store_path) or csv_path
+
+
+def _frame_layout(df):
+    """
+    열마다 저장 방식(숫자/날짜/범주)과 dtype을 정합니다.
+    문자열 열은 범주(정수 코드 + 범주 목록)로 저장하고, 그 밖의 객체 열은 파일에 쓸 수 없으므로 TypeError를 냅니다.
+    (객체 배열을 그대로 쓰면 PyObject 포인터가 기록되어 다른 프로세스에서 읽을 때 프로세스가 죽습니다.)
+    """
+    columns = []
+    for name in df.columns:
+        series = df[name]
+        if not isinstance(series.dtype, pd.CategoricalDtype) and pd.api.types.is_string_dtype(series.dtype):
+            series = series.astype('category')
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            if not all(isinstance(c, str) for c in series.cat.categories):
+                raise TypeError(f"스냅샷에 저장할 수 없는 범주 열입니다: {name} (문자열 범주만 지원)")
+            codes = series.cat.codes.to_numpy()
+            columns.append(({'name': name, 'kind': 'category', 'dtype': codes.dtype.str,
+                             'categories': list(series.cat.categories)}, codes))
+        elif isinstance(series.dtype, np.dtype) and series.dtype.kind in 'biufcmM':
+            values = series.to_numpy()
+            columns.append(({'name': name, 'kind': 'array', 'dtype': values.dtype.str}, values))
+        else:
+            raise TypeError(f"스냅샷에 저장할 수 없는 열 형식입니다: {name} ({series.dtype})")
+    return columns
+
+
+def write_snapshot(frames: dict, meta: dict, path=SNAPSHOT_PATH):
+    """
+    {이름: 데이터프레임}과 메타데이터를 파일 하나로 저장합니다.
+    각 열은 64바이트 정렬된 연속 배열로 기록하고, 열 위치는 파일 끝의 JSON 헤더에 적습니다.
+    """
+    header = {'meta': meta, 'frames': {}}
+    # 저장할 수 없는 열이 있으면 파일을 만들기 전에 실패하도록 배치를 먼저 정합니다.
+    layouts = {frame_name: (len(df), _frame_layout(df)) for frame_name, df in frames.items()}
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(b'\0' * PREAMBLE_SIZE)
+        for frame_name, (length, columns) in layouts.items():
+            layout = []
+            for info, values in columns:
+                f.write(b'\0' * (-f.tell() % ALIGN))
+                info['offset'] = f.tell()
+                f.write(np.ascontiguousarray(values).tobytes())
+                layout.append(info)
+            header['frames'][frame_name] = {'length': length, 'columns': layout}
+
+        header_bytes = json.dumps(header, ensure_ascii=False).encode()
+        header_offset = f.tell()
+        f.write(header_bytes)
+        f.seek(0)
+        f.write(MAGIC + np.array([header_offset, len(header_bytes)], dtype='<u8').tobytes())
+    os.replace(tmp_path, path)
+    return path
+
+
+def read_snapshot(path=SNAPSHOT_PATH):
+    """
+    스냅샷을 읽기 전용으로 메모리 매핑해 ({이름: 데이터프레임}, 메타데이터)를 반환합니다.
+    숫자·날짜 열은 매핑된 페이지를 그대로 참조하며 복사하지 않습니다. 파일이 없으면 (None, None)입니다.
+    """
+    if not os.path.exists(path):
+        return None, None
+    mm = np.memmap(path, dtype=np.uint8, mode='r')
+    if bytes(mm[:len(MAGIC)]) != MAGIC:
+        return None, None
+    header_offset, header_len = np.frombuffer(mm[len(MAGIC):len(MAGIC) + 16], dtype='<u8')
+    header = json.loads(bytes(mm[header_offset:header_offset + header_len]).decode())
+
+    frames = {}
+    for frame_name, spec in header['frames'].items():
+        data = {}
+        for info in spec['columns']:
+            values = np.ndarray((spec['length'],), dtype=np.dtype(info['dtype']), buffer=mm, offset=info['offset'])
+            if info['kind'] == 'category':
+                values = pd.Categorical.from_codes(values, categories=info['categories'])
+            data[info['name']] = values
+        frames[frame_name] = pd.DataFrame(data, copy=False)
+    return frames, header['meta']
+
+
+def refresh_derived_store(csv_path=trade_store.TRADE_CSV, store_path=trade_store.TRADE_STORE,
+                          derived_path=trade_store.DERIVED_STORE, verify=False):
+    """
+    원본에서 새로 추가되거나 값이 수정·삭제된 (국가, 월)의 꼬리 구간만 파생 지표를 다시 계산해 파생 저장소에 기록합니다.
+    verify=True이면 원본 전체를 다시 계산한 결과와 비교합니다. 반환값은 (파생 데이터, 변경된 행 수)입니다.
+    """
+    version = trade_store.dataset_version(csv_path, store_path)
+    if version is None:
+        return None, 0
+
+    derived_df, source_version = trade_store.read_derived_store(derived_path)
+    if derived_df is not None and source_version == version:
+        return derived_df, 0
+
+    source_df = trade_store.load_trade_frame(csv_path, store_path)
+    if derived_df is None:
+        updated_df, n_changed = metrics_engine.add_derived_metrics(source_df), len(source_df)
+    else:
+        updated_df, n_changed = metrics_engine.update_derived_metrics(derived_df, source_df)
+
+    if verify and not metrics_engine.matches_full_recompute(updated_df, source_df):
+        raise ValueError("증분 계산 결과가 전체 재계산 결과와 일치하지 않습니다.")
+
+    trade_store.write_derived_store(updated_df, version, derived_path)
+    return updated_df, n_changed
+
+
+def build_snapshot(csv_path=trade_store.TRADE_CSV, store_path=trade_store.TRADE_STORE,
+                   kospi_path=kospi_store.KOSPI_CSV, path=SNAPSHOT_PATH, force=False,
+                   derived_path=trade_store.DERIVED_STORE, verify=False):
+    """
+    원본이 바뀌었거나 force=True일 때만 스냅샷을 새로 만듭니다.
+    반환값은 (스냅샷 경로 또는 None, 메시지)입니다.
+    """
+    trade_path = trade_source_path(csv_path, store_path)
+    if not os.path.exists(trade_path):
+        return None, f"무역 데이터 원본({csv_path})이 없어 스냅샷을 만들지 않았습니다."
+
+    _, meta = read_snapshot(path)
+    if not force and meta is not None and stamp_matches(meta.get('trade'), trade_path) \
+            and (meta.get('kospi') is None) == (not os.path.exists(kospi_path)) \
+            and (meta.get('kospi') is None or stamp_matches(meta['kospi'], kospi_path)):
+        return path, "스냅샷이 최신 상태입니다."
+
+    # [수정] 파생 지표는 파생 저장소를 증분 갱신해 얻으므로, 새 달이 붙었을 때는 그 꼬리 구간만 계산합니다.
+    trade_df, _ = refresh_derived_store(csv_path, store_path, derived_path, verify)
+    frames = {'trade': trade_store.compact_frame(trade_df)}
+    meta = {'trade': source_stamp(trade_path), 'kospi': None}
+
+    kospi_daily = kospi_store.KospiStore(kospi_path).read()
+    if kospi_daily is not None:
+        frames['kospi'] = kospi_daily
+        meta['kospi'] = source_stamp(kospi_path)
+
+    write_snapshot(frames, meta, path)
+    return path, "스냅샷을 새로 만들었습니다."
+
+
+def load_trade_snapshot(csv_path=trade_store.TRADE_CSV, store_path=trade_store.TRADE_STORE, path=SNAPSHOT_PATH):
+    """원본 체크섬이 일치할 때만 스냅샷의 무역 데이터(파생 지표 포함)를 반환합니다."""
+    frames, meta = read_snapshot(path)
+    if frames is None or not stamp_matches(meta.get('trade'), trade_source_path(csv_path, store_path)):
+        return None
+    return frames['trade']
+
+
+def load_kospi_snapshot(kospi_path=kospi_store.KOSPI_CSV, path=SNAPSHOT_PATH):
+    """원본 체크섬이 일치할 때만 스냅샷의 KOSPI 일별 데이터를 반환합니다."""
+    frames, meta = read_snapshot(path)
+    if frames is None or 'kospi' not in frames or not stamp_matches(meta.get('kospi'), kospi_path):
+        return None
+    return frames['kospi']
+
+
+def _rss_kb():
+    """
+    /proc/self/status에서 (전체 RSS, 파일 매핑 RSS)를 KB 단위로 읽습니다 (리눅스 전용).
+    파일 매핑 RSS는 페이지 캐시를 통해 프로세스 간에 공유되는 부분입니다.
+    """
+    values = {}
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith(('VmRSS:', 'RssFile:')):
+                key, amount = line.split(':')
+                values[key] = int(amount.split()[0])
+    return values.get('VmRSS'), values.get('RssFile')
+
+
+def _worker(use_snapshot):
+    """워커 하나의 콜드 스타트: 데이터를 준비하고 모든 열을 한 번씩 읽은 뒤 시간과 RSS를 보고합니다."""
+    import time
+    start = time.perf_counter()
+    trade_df = load_trade_snapshot() if use_snapshot else None
+    if trade_df is None:
+        trade_df = trade_store.compact_frame(metrics_engine.add_derived_metrics(trade_store.load_trade_frame()))
+    trade_df.select_dtypes('number').sum()
+    elapsed = time.perf_counter() - start
+    rss, rss_file = _rss_kb()
+    return {'seconds': elapsed, 'rss_kb': rss, 'rss_file_kb': rss_file}
+
+
+def measure(n_workers=4):
+    """스냅샷 유무에 따라 워커 N개의 첫 데이터 준비 시간과 RSS를 비교합니다."""
+    from concurrent.futures import ProcessPoolExecutor
+    import multiprocessing
+
+    context = multiprocessing.get_context('spawn')
+    results = {}
+    for use_snapshot in (False, True):
+        with ProcessPoolExecutor(max_workers=n_workers, mp_context=context, max_tasks_per_child=1) as pool:
+            runs = list(pool.map(_worker, [use_snapshot] * n_workers))
+        results['snapshot' if use_snapshot else 'source'] = {
+            'workers': n_workers,
+            'max_seconds': max(r['seconds'] for r in runs),
+            'total_rss_mb': sum(r['rss_kb'] for r in runs) / 1024,
+            'private_rss_mb': sum(r['rss_kb'] - (r['rss_file_kb'] or 0) for r in runs) / 1024,
+        }
+    return results
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if args and args[0] == 'measure':
+        n_workers = int(args[2]) if len(args) > 2 and args[1] == '-n' else 4
+        build_snapshot()
+        print(json.dumps(measure(n_workers), ensure_ascii=False, indent=2))
+    else:
+        _, message = build_snapshot(force='--force' in args, verify='--verify' in args)
+        print(message)
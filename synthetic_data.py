@@ -0,0 +1,63 @@
+# synthetic_data.py
+
+import numpy as np
+import pandas as pd
+
+BASE_COUNTRIES = ['총합', '미국', '중국']
+
+
+def country_names(n_countries: int):
+    """앞의 세 개는 기존 샘플과 같은 이름을, 나머지는 '국가004' 형식의 이름을 사용합니다."""
+    extra = [f"국가{i:03d}" for i in range(len(BASE_COUNTRIES) + 1, n_countries + 1)]
+    return (BASE_COUNTRIES + extra)[:n_countries]
+
+
+def make_trade_data(n_countries: int = 3, n_months: int = 125, start: str = '2014-01-01', seed: int = 0) -> pd.DataFrame:
+    """
+    국가 N개 × 월 M개의 무역 데이터를 시드 기반으로 한 번에 생성합니다.
+    계절성(월별 패턴)에 국가별 규모와 로그 랜덤워크를 곱해 만들며, 같은 시드면 항상 같은 값이 나옵니다.
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(start=start, periods=n_months, freq='MS')
+    season = np.abs(dates.month.to_numpy() - 6.5)[None, :]
+    scale = rng.uniform(0.05, 1.0, size=(n_countries, 1))
+    scale[0] = 1.0
+
+    export = 1e9 * (50 + 10 * (1 + 0.5 * season)) * scale
+    imports = 1e9 * (45 + 8 * (1 + 0.4 * season)) * scale
+    export *= np.exp(np.cumsum(rng.normal(0.002, 0.03, size=export.shape), axis=1))
+    imports *= np.exp(np.cumsum(rng.normal(0.002, 0.03, size=imports.shape), axis=1))
+
+    trade_df = pd.DataFrame({
+        'Date': np.tile(dates.to_numpy(), n_countries),
+        'country_name': pd.Categorical(np.repeat(country_names(n_countries), n_months), categories=country_names(n_countries)),
+        'export_amount': export.ravel(),
+        'import_amount': imports.ravel(),
+    })
+    trade_df['trade_balance'] = trade_df['export_amount'] - trade_df['import_amount']
+    return trade_df
+
+
+def make_kospi_data(start: str = '2014-01-01', end: str = '2024-05-01', freq: str = 'B', seed: int = 0) -> pd.DataFrame:
+    """
+    KOSPI 200 시세를 기하 랜덤워크로 생성합니다. freq='B'이면 영업일 기준 일별 데이터입니다.
+    yfinance와 같은 Date/Open/High/Low/Close/Volume 열을 가집니다.
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(start=start, end=end, freq=freq)
+    close = 250 * np.exp(np.cumsum(rng.normal(0.0002, 0.012, size=len(dates))))
+    spread = np.abs(rng.normal(0, 0.006, size=len(dates)))
+    return pd.DataFrame({
+        'Date': dates,
+        'Open': close * (1 + rng.normal(0, 0.003, size=len(dates))),
+        'High': close * (1 + spread),
+        'Low': close * (1 - spread),
+        'Close': close,
+        'Volume': rng.integers(50_000, 200_000, size=len(dates)),
+    })
+
+
+def make_kospi_years(n_years: int, end: str = '2024-05-01', seed: int = 0) -> pd.DataFrame:
+    """마지막 날짜로부터 n_years년 분량의 일별 KOSPI 데이터를 생성합니다."""
+    start = (pd.Timestamp(end) - pd.DateOffset(years=n_years)).strftime('%Y-%m-%d')
+    return make_kospi_data(start=start, end=end, freq='B', seed=seed)
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 모듈이 저장소 최상위에 있으므로, 어느 디렉터리에서 pytest를 실행해도 가져올 수 있게 합니다.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,18 @@
+import os
+
+import pandas as pd
+
+import batch
+import synthetic_data
+
+
+def test_run_does_not_create_the_dashboard_store(tmp_path):
+    csv_path, store_path = str(tmp_path / 'trade_data.csv'), str(tmp_path / 'trade_data.arrow')
+    output_dir = str(tmp_path / 'out')
+    synthetic_data.make_trade_data(n_countries=3, n_months=36, start='2021-01-01').to_csv(csv_path, index=False)
+
+    n_countries, _ = batch.run(csv_path, store_path, output_dir, workers=1)
+    assert not os.path.exists(store_path)
+    summary = pd.read_parquet(os.path.join(output_dir, 'summary.parquet'))
+    assert len(summary) == n_countries == 3
+    assert os.path.exists(os.path.join(batch.partition_path(output_dir, summary['country_name'].iloc[0]), 'part-0.parquet'))
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import chart_builder
+import correlation
+import kospi_store
+import metrics_engine
+import synthetic_data
+
+METRICS = ['export_amount_yoy_growth', 'import_amount_trailing_12m', 'trade_balance_trailing_12m_yoy_growth']
+LAGS = [-24, -7, 0, 5, 24]
+
+
+@pytest.fixture(scope='module')
+def data():
+    trade = metrics_engine.add_derived_metrics(synthetic_data.make_trade_data(n_countries=3, n_months=120, start='2014-01-01'))
+    # 중간에 빠진 달이 있어도 겹치는 달만으로 계산해야 합니다.
+    trade = trade.drop(index=trade.index[::17]).reset_index(drop=True)
+    kospi = kospi_store.to_monthly(synthetic_data.make_kospi_data(start='2013-01-01', end='2024-06-30'))
+    return trade, kospi, correlation.LeadLagCorrelation(trade, kospi)
+
+
+def _pair(trade, returns, country, metric, lag):
+    """pandas로 직접 맞춘 (지표[t], 수익률[t + lag]) 시리즈 쌍."""
+    all_months = metrics_engine.month_index(trade['Date'])
+    full = np.arange(all_months.min(), all_months.max() + 1)
+    country_df = trade[trade['country_name'] == country]
+    x = pd.Series(country_df[metric].to_numpy(), index=metrics_engine.month_index(country_df['Date'])).reindex(full)
+    y = pd.Series(returns.reindex(full + lag).to_numpy(), index=full)
+    return x, y
+
+
+def test_full_window_matches_pandas_corr(data):
+    trade, kospi, engine = data
+    returns = correlation.monthly_returns(kospi)
+    assert np.isfinite(engine.corr).mean() > 0.5
+    for metric in METRICS:
+        for country in engine.countries:
+            for lag in LAGS:
+                x, y = _pair(trade, returns, country, metric, lag)
+                expected = x.corr(y, min_periods=correlation.MIN_PERIODS)
+                actual = engine.corr[engine.metrics.index(metric), engine.countries.index(country), list(engine.lags).index(lag)]
+                np.testing.assert_allclose(actual, expected, rtol=1e-9, atol=1e-12)
+
+
+def test_rolling_matches_pandas_rolling_corr(data):
+    trade, kospi, engine = data
+    returns = correlation.monthly_returns(kospi)
+    window = correlation.ROLLING_WINDOW
+    for metric in METRICS:
+        for lag in (-3, 0, 6):
+            rolling = engine.rolling(metric, lag)
+            for country in engine.countries:
+                x, y = _pair(trade, returns, country, metric, lag)
+                expected = x.rolling(window, min_periods=correlation.MIN_PERIODS).corr(y)
+                actual = rolling[country].to_numpy()
+                np.testing.assert_allclose(actual, expected.to_numpy(), rtol=1e-9, atol=1e-12)
+
+
+def test_heatmap_ticks_follow_lag_range():
+    spec = chart_builder.build_heatmap(['미국'], 'test', lags=np.arange(-12, 13)).to_dict()
+    assert spec['encoding']['x']['axis']['values'] == [-12, -6, 0, 6, 12]
+    spec = chart_builder.build_heatmap(['미국'], 'test').to_dict()
+    assert spec['encoding']['x']['axis']['values'][-1] == correlation.MAX_LAG - correlation.MAX_LAG % chart_builder.LAG_TICK_STEP
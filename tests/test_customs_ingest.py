@@ -0,0 +1,74 @@
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+import customs_ingest
+import trade_store
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures', 'customs')
+MONTHS = ['2024-03', '2024-04', '2024-05']
+
+
+@pytest.fixture
+def dirs(tmp_path):
+    raw_dir = tmp_path / 'raw'
+    shutil.copytree(FIXTURES, raw_dir)
+    return str(raw_dir), str(tmp_path / 'state'), str(tmp_path / 'trade_data.csv'), str(tmp_path / 'trade_data_hs.csv')
+
+
+def _amounts(df, date, country):
+    row = df[(df['Date'] == date) & (df['country_name'] == country)]
+    assert len(row) == 1
+    return tuple(row[['export_amount', 'import_amount', 'trade_balance']].iloc[0])
+
+
+@pytest.mark.parametrize('chunk_rows', [1, customs_ingest.CHUNK_ROWS])
+def test_ingest_and_combine(dirs, chunk_rows):
+    raw_dir, state_dir, output, hs_output = dirs
+    processed, skipped = customs_ingest.ingest(raw_dir, state_dir, chunk_rows=chunk_rows)
+    assert processed == MONTHS and skipped == []
+
+    n_rows = customs_ingest.combine(state_dir, output, hs_output)
+    df = pd.read_csv(output)
+    assert n_rows == len(df) == 9
+    # '총계' 행은 버리고, 월마다 국가 합계인 '총합' 행을 맨 앞에 둡니다.
+    assert '총계' not in set(df['country_name'])
+    assert list(df.groupby('Date')['country_name'].first()) == [trade_store.TOTAL_COUNTRY] * 3
+    assert _amounts(df, '2024-03-01', '미국') == (150, 50, 100)
+    assert _amounts(df, '2024-03-01', trade_store.TOTAL_COUNTRY) == (220, 140, 80)
+    assert _amounts(df, '2024-04-01', '중국') == (25, 60, -35)
+    assert _amounts(df, '2024-05-01', '일본') == (15, 25, -10)
+
+    hs = pd.read_csv(hs_output, dtype={'hs_chapter': str})
+    row = hs[(hs['Date'] == '2024-04-01') & (hs['country_name'] == '중국')]
+    assert list(row['hs_chapter']) == ['87'] and list(row['export_amount']) == [25]
+
+
+def test_resume_skips_unchanged_months(dirs):
+    raw_dir, state_dir, output, hs_output = dirs
+    customs_ingest.ingest(raw_dir, state_dir)
+    assert customs_ingest.ingest(raw_dir, state_dir) == ([], MONTHS)
+
+    # 원본이 바뀐 달만 다시 처리합니다.
+    path = os.path.join(raw_dir, '2024-04.jsonl')
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"year": "2024.04", "statCdCntnKor1": "일본", "hsCd": "2710", "expDlr": 7, "impDlr": 3}\n')
+    processed, skipped = customs_ingest.ingest(raw_dir, state_dir)
+    assert processed == ['2024-04'] and skipped == ['2024-03', '2024-05']
+
+    customs_ingest.combine(state_dir, output, hs_output)
+    df = pd.read_csv(output)
+    assert _amounts(df, '2024-04-01', '일본') == (7, 3, 4)
+    assert _amounts(df, '2024-04-01', trade_store.TOTAL_COUNTRY) == (152, 93, 59)
+
+
+def test_oversized_api_json_is_rejected(dirs, monkeypatch):
+    raw_dir, state_dir, _, _ = dirs
+    monkeypatch.setattr(customs_ingest, 'MAX_JSON_BYTES', 100)
+    with pytest.raises(ValueError, match='JSON Lines'):
+        customs_ingest.ingest(raw_dir, state_dir)
+    # 문제 파일 앞의 월은 이미 끝났으므로 다음 실행에서 다시 처리하지 않습니다.
+    monkeypatch.setattr(customs_ingest, 'MAX_JSON_BYTES', 10 ** 6)
+    assert customs_ingest.ingest(raw_dir, state_dir) == (['2024-05'], ['2024-03', '2024-04'])
@@ -0,0 +1,77 @@
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+import kospi_store
+import synthetic_data
+
+
+class SlowSource(kospi_store.FrameSource):
+    """동시에 들어온 요청이 겹치도록 fetch를 잠시 붙잡아 두는 공급원."""
+
+    def fetch(self, start, end):
+        time.sleep(0.2)
+        return super().fetch(start, end)
+
+
+def _history(days_ago):
+    """최근 600일 중 오늘로부터 days_ago일 전까지의 영업일 시세."""
+    today = pd.Timestamp.now().normalize()
+    daily = synthetic_data.make_kospi_data(start=(today - pd.Timedelta(days=600)).strftime('%Y-%m-%d'),
+                                           end=today.strftime('%Y-%m-%d'))
+    return daily[daily['Date'] <= today - pd.Timedelta(days=days_ago)].reset_index(drop=True)
+
+
+def test_source_interface_is_abstract():
+    with pytest.raises(TypeError):
+        kospi_store.KospiSource()
+
+
+def test_refresh_appends_only_new_rows(tmp_path):
+    path = str(tmp_path / 'kospi200.csv')
+    source = kospi_store.FrameSource(_history(days_ago=10))
+    refresher = kospi_store.KospiRefresher(source, kospi_store.KospiStore(path))
+
+    data, message = refresher.get()
+    assert message is None and len(data) == len(source.daily_df)
+    with open(path, 'rb') as f:
+        before = f.read()
+    version = refresher.version
+
+    source.daily_df = _history(days_ago=1)
+    refresher.refresh()
+    with open(path, 'rb') as f:
+        after = f.read()
+    # 기존 바이트는 그대로 두고 뒤에만 덧붙입니다.
+    assert after.startswith(before) and len(after) > len(before)
+    stored = kospi_store.KospiStore(path).read()
+    assert stored['Date'].is_unique and len(stored) == len(source.daily_df)
+    assert refresher.version == version + 1
+
+    # 새 행이 없으면 파일도 버전도 그대로입니다.
+    refresher.refresh()
+    with open(path, 'rb') as f:
+        assert f.read() == after
+    assert refresher.version == version + 1
+
+
+def test_concurrent_gets_share_one_fetch(tmp_path):
+    source = SlowSource(_history(days_ago=1))
+    refresher = kospi_store.KospiRefresher(source, kospi_store.KospiStore(str(tmp_path / 'kospi200.csv')))
+    barrier = threading.Barrier(8)
+    results = []
+
+    def worker():
+        barrier.wait()
+        results.append(refresher.get())
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert source.calls == 1
+    assert len(results) == 8 and all(data is results[0][0] for data, _ in results)
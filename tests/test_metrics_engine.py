@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import metrics_engine
+import snapshot
+import synthetic_data
+import trade_store
+
+
+@pytest.fixture
+def source():
+    df = synthetic_data.make_trade_data(n_countries=5, n_months=60, start='2019-01-01')
+    return df.sort_values(['country_name', 'Date']).reset_index(drop=True)
+
+
+def _reference_metrics(trade_df):
+    """벡터화 이전의 국가별 groupby/rolling/pct_change 구현 (연속된 월 데이터 기준)."""
+    trade_df = trade_df.sort_values(by=['country_name', 'Date']).reset_index(drop=True)
+    for col in trade_store.AMOUNT_COLUMNS:
+        grouped = trade_df.groupby('country_name', observed=True)
+        trade_df[f'{col}_trailing_12m'] = grouped[col].rolling(window=12, min_periods=12).sum().reset_index(level=0, drop=True)
+        trade_df[f'{col}_yoy_growth'] = grouped[col].pct_change(periods=12) * 100
+        trade_df[f'{col}_trailing_12m_yoy_growth'] = trade_df.groupby('country_name', observed=True)[f'{col}_trailing_12m'].pct_change(periods=12) * 100
+    return trade_df.replace([np.inf, -np.inf], np.nan)
+
+
+def test_vectorized_metrics_match_groupby_reference(source):
+    df = source.astype({'country_name': str}).copy()
+    # 결측치와 0(0으로 나누기)도 같은 결과를 내야 합니다.
+    df.loc[df.index[::23], 'export_amount'] = np.nan
+    df.loc[df.index[5::31], 'import_amount'] = 0.0
+    df['trade_balance'] = df['export_amount'] - df['import_amount']
+    shuffled = df.sample(frac=1, random_state=1)
+
+    expected = _reference_metrics(shuffled)
+    actual = metrics_engine.add_derived_metrics(shuffled).sort_values(by=['country_name', 'Date']).reset_index(drop=True)
+    columns = trade_store.AMOUNT_COLUMNS + metrics_engine.derived_columns()
+    assert actual[['Date', 'country_name']].equals(expected[['Date', 'country_name']])
+    np.testing.assert_allclose(actual[columns].to_numpy(dtype='float64'), expected[columns].to_numpy(dtype='float64'),
+                               rtol=1e-9, equal_nan=True)
+
+
+def _without_last_month(df):
+    return df[df['Date'] < df['Date'].max()].reset_index(drop=True)
+
+
+def _revise(df, country, date, factor=1.5):
+    df = df.copy()
+    row = (df['country_name'] == country) & (df['Date'] == pd.Timestamp(date))
+    df.loc[row, 'export_amount'] *= factor
+    df['trade_balance'] = df['export_amount'] - df['import_amount']
+    return df
+
+
+def _update(previous_source, source):
+    return metrics_engine.update_derived_metrics(metrics_engine.add_derived_metrics(previous_source), source)
+
+
+def test_append_recomputes_only_changed_rows(source):
+    updated, n_changed = _update(_without_last_month(source), source)
+    assert n_changed == source['country_name'].nunique()
+    assert metrics_engine.matches_full_recompute(updated, source)
+
+
+def test_revised_month_is_detected(source):
+    country = source['country_name'].iloc[0]
+    revised = _revise(source, country, '2020-06-01')
+    updated, n_changed = _update(source, revised)
+    assert n_changed == 1
+    assert metrics_engine.matches_full_recompute(updated, revised)
+    # 수정 전 결과를 그대로 두면 전체 재계산과 달라야 검증이 의미가 있습니다.
+    assert not metrics_engine.matches_full_recompute(metrics_engine.add_derived_metrics(source), revised)
+
+
+def test_deleted_rows_and_countries_are_dropped(source):
+    countries = source['country_name'].unique()
+    trimmed = source[(source['country_name'] != countries[-1])
+                     & ~((source['country_name'] == countries[0]) & (source['Date'] == pd.Timestamp('2021-03-01')))]
+    updated, n_changed = _update(source, trimmed.reset_index(drop=True))
+    assert n_changed == 1 + (source['country_name'] == countries[-1]).sum()
+    assert metrics_engine.matches_full_recompute(updated, trimmed)
+
+
+def test_unchanged_source_returns_previous_frame(source):
+    derived = metrics_engine.add_derived_metrics(source)
+    updated, n_changed = metrics_engine.update_derived_metrics(derived, source)
+    assert n_changed == 0 and updated is derived
+
+
+def test_unsorted_previous_result_and_new_country(source):
+    countries = source['country_name'].unique()
+    previous = source[source['country_name'] != countries[2]]
+    derived = metrics_engine.add_derived_metrics(previous).sample(frac=1, random_state=0)
+    revised = _revise(source, countries[1], '2019-02-01')
+    updated, _ = metrics_engine.update_derived_metrics(derived, revised)
+    assert metrics_engine.matches_full_recompute(updated, revised)
+
+
+def test_refresh_derived_store_round_trip(tmp_path, source):
+    csv_path, store_path = str(tmp_path / 'trade_data.csv'), str(tmp_path / 'trade_data.arrow')
+    derived_path = str(tmp_path / 'trade_data_derived.arrow')
+    _without_last_month(source).to_csv(csv_path, index=False)
+    _, n_changed = snapshot.refresh_derived_store(csv_path, store_path, derived_path, verify=True)
+    assert n_changed == len(source) - source['country_name'].nunique()
+
+    revised = _revise(source, source['country_name'].iloc[0], '2019-09-01')
+    revised.to_csv(csv_path, index=False)
+    updated, n_changed = snapshot.refresh_derived_store(csv_path, store_path, derived_path, verify=True)
+    assert n_changed == source['country_name'].nunique() + 1
+    assert updated['Date'].max() == source['Date'].max()
+
+    stored, version = trade_store.read_derived_store(derived_path)
+    assert version == trade_store.dataset_version(csv_path, store_path)
+    assert np.array_equal(stored['Date'].to_numpy(), updated['Date'].to_numpy())
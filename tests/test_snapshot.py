@@ -0,0 +1,59 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import snapshot
+
+
+def _frame():
+    return pd.DataFrame({
+        'Date': pd.date_range('2020-01-01', periods=4, freq='MS'),
+        'country_name': pd.Categorical(['미국', '중국', '미국', '일본']),
+        'label': pd.Series(['a', 'b', None, 'd'], dtype=object),
+        'code': pd.Series(['x', 'y', 'x', 'z'], dtype='str'),
+        'amount': np.array([1.5, np.nan, 3.0, 4.0]),
+        'count': np.arange(4, dtype='int64'),
+    })
+
+
+def test_round_trip_strings_categories_and_dates(tmp_path):
+    path = str(tmp_path / 'test.snapshot')
+    df = _frame()
+    snapshot.write_snapshot({'trade': df}, {'note': '테스트'}, path)
+    frames, meta = snapshot.read_snapshot(path)
+    out = frames['trade']
+
+    assert meta == {'note': '테스트'}
+    assert list(out.columns) == list(df.columns)
+    assert out['Date'].equals(df['Date'])
+    assert out['country_name'].astype(str).tolist() == df['country_name'].astype(str).tolist()
+    assert out['label'].tolist()[:2] == ['a', 'b'] and pd.isna(out['label'].iloc[2])
+    assert out['code'].astype(str).tolist() == ['x', 'y', 'x', 'z']
+    np.testing.assert_array_equal(out['amount'].to_numpy(), df['amount'].to_numpy())
+    np.testing.assert_array_equal(out['count'].to_numpy(), df['count'].to_numpy())
+
+
+def test_snapshot_is_readable_from_another_process(tmp_path):
+    # 객체 포인터가 기록되면 다른 프로세스에서 읽을 때 프로세스가 죽습니다.
+    path = str(tmp_path / 'test.snapshot')
+    snapshot.write_snapshot({'trade': _frame()}, {}, path)
+    code = (
+        "import snapshot; frames, _ = snapshot.read_snapshot(%r); "
+        "print(frames['trade']['label'].tolist())" % path
+    )
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run([sys.executable, '-c', code], cwd=root, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "['a', 'b', nan, 'd']"
+
+
+def test_unsupported_object_column_is_rejected_before_writing(tmp_path):
+    path = str(tmp_path / 'test.snapshot')
+    df = pd.DataFrame({'payload': pd.Series([{'a': 1}, [2]], dtype=object)})
+    with pytest.raises(TypeError):
+        snapshot.write_snapshot({'trade': df}, {}, path)
+    assert not os.path.exists(path) and not os.path.exists(f"{path}.tmp")
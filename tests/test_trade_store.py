@@ -0,0 +1,37 @@
+import os
+
+import pandas as pd
+
+import synthetic_data
+import trade_store
+
+
+def _append_month(csv_path):
+    """CSV 마지막 달의 행을 다음 달로 복사해 덧붙이고, 그 달을 반환합니다."""
+    df = pd.read_csv(csv_path, parse_dates=['Date'])
+    rows = df[df['Date'] == df['Date'].max()].copy()
+    rows['Date'] = rows['Date'] + pd.DateOffset(months=1)
+    # 파일 시스템의 시각 단위와 관계없이 저장소가 CSV보다 오래된 상태를 만듭니다.
+    store_path = csv_path.replace('.csv', '.arrow')
+    old = os.stat(store_path).st_mtime_ns - 10 ** 9
+    os.utime(store_path, ns=(old, old))
+    rows.to_csv(csv_path, mode='a', header=False, index=False, date_format='%Y-%m-%d')
+    return rows['Date'].iloc[0]
+
+
+def test_csv_appended_after_conversion_is_not_ignored(tmp_path):
+    csv_path, store_path = str(tmp_path / 'trade_data.csv'), str(tmp_path / 'trade_data.arrow')
+    synthetic_data.make_trade_data(n_countries=3, n_months=24, start='2022-01-01').to_csv(csv_path, index=False)
+    trade_store.convert_csv_to_store(csv_path, store_path)
+    assert trade_store.source_path(csv_path, store_path) == store_path
+    version = trade_store.dataset_version(csv_path, store_path)
+
+    new_month = _append_month(csv_path)
+    assert trade_store.source_path(csv_path, store_path) == csv_path
+    assert trade_store.dataset_version(csv_path, store_path) != version
+    assert trade_store.load_trade_frame(csv_path, store_path)['Date'].max() == new_month
+
+    # 다시 변환하면 저장소가 원본으로 돌아옵니다.
+    trade_store.convert_csv_to_store(csv_path, store_path)
+    assert trade_store.source_path(csv_path, store_path) == store_path
+    assert trade_store.load_trade_frame(csv_path, store_path)['Date'].max() == new_month
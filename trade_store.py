@@ -0,0 +1,179 @@
+# trade_store.py
+
+import os
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.feather as feather
+
+TRADE_CSV = "trade_data.csv"
+TRADE_STORE = "trade_data.arrow"
+DERIVED_STORE = "trade_data_derived.arrow"
+KEY_COLUMNS = ['Date', 'country_name']
+SORT_COLUMNS = ['country_name', 'Date']
+AMOUNT_COLUMNS = ['export_amount', 'import_amount', 'trade_balance']
+CSV_DTYPES = {'country_name': 'category', **{col: 'float64' for col in AMOUNT_COLUMNS}}
+TOTAL_COUNTRY = '총합'
+
+
+def read_trade_csv(filename=TRADE_CSV):
+    """
+    원본 CSV를 타입이 지정된 열(datetime64, category, float64)로 읽어옵니다.
+    """
+    trade_df = pd.read_csv(filename, usecols=KEY_COLUMNS + AMOUNT_COLUMNS, dtype=CSV_DTYPES, parse_dates=['Date'])
+    return trade_df.sort_values(by=SORT_COLUMNS).reset_index(drop=True)
+
+
+def convert_csv_to_store(csv_path=TRADE_CSV, store_path=TRADE_STORE):
+    """
+    trade_data.csv를 비압축 Arrow IPC(Feather v2) 파일로 한 번 변환합니다.
+    국가·날짜 순으로 정렬해 저장하므로 이후에는 메모리 매핑으로 바로 읽을 수 있습니다.
+    """
+    trade_df = read_trade_csv(csv_path)
+    table = pa.Table.from_pandas(trade_df, preserve_index=False)
+    tmp_path = f"{store_path}.tmp"
+    feather.write_feather(table, tmp_path, compression='uncompressed')
+    os.replace(tmp_path, store_path)
+    return store_path
+
+
+def store_is_current(csv_path=TRADE_CSV, store_path=TRADE_STORE):
+    """
+    변환된 저장소가 있고 CSV보다 오래되지 않았는지 확인합니다.
+    CSV에 새 달을 덧붙이는 등 저장소를 만든 뒤 CSV가 바뀌었으면 False입니다.
+    """
+    if not os.path.exists(store_path):
+        return False
+    if not os.path.exists(csv_path):
+        return True
+    return os.stat(store_path).st_mtime_ns >= os.stat(csv_path).st_mtime_ns
+
+
+def source_path(csv_path=TRADE_CSV, store_path=TRADE_STORE):
+    """실제로 읽게 될 원본 경로입니다. 최신 저장소가 우선이고, 둘 다 없으면 None입니다."""
+    if store_is_current(csv_path, store_path):
+        return store_path
+    return csv_path if os.path.exists(csv_path) else None
+
+
+def load_trade_frame(csv_path=TRADE_CSV, store_path=TRADE_STORE, columns=None, countries=None):
+    """
+    변환된 저장소가 최신이면 필요한 열과 국가만 메모리 매핑으로 읽고, 없거나 CSV보다 오래되었으면 CSV로 대체합니다.
+    columns를 지정해도 키 열(Date, country_name)은 항상 포함됩니다.
+    """
+    wanted = KEY_COLUMNS + [col for col in (AMOUNT_COLUMNS if columns is None else columns) if col not in KEY_COLUMNS]
+
+    if store_is_current(csv_path, store_path):
+        table = feather.read_table(store_path, columns=wanted, memory_map=True)
+        return _filter_countries(table, countries).to_pandas()
+
+    if not os.path.exists(csv_path):
+        return None
+    trade_df = read_trade_csv(csv_path)[wanted]
+    if countries is not None:
+        trade_df = trade_df[trade_df['country_name'].isin(list(countries))].reset_index(drop=True)
+    return trade_df
+
+
+def _filter_countries(table, countries):
+    """Arrow 테이블에서 지정한 국가의 행만 남깁니다."""
+    if countries is None:
+        return table
+    return table.filter(pc.is_in(table['country_name'], value_set=pa.array(list(countries))))
+
+
+def write_derived_store(trade_df, source_version, derived_path=DERIVED_STORE):
+    """
+    파생 지표까지 계산된 데이터를 원본 데이터셋 버전과 함께 Arrow 파일로 저장합니다.
+    """
+    table = pa.Table.from_pandas(trade_df, preserve_index=False)
+    metadata = {**(table.schema.metadata or {}), b'source_version': source_version.encode()}
+    tmp_path = f"{derived_path}.tmp"
+    feather.write_feather(table.replace_schema_metadata(metadata), tmp_path, compression='uncompressed')
+    os.replace(tmp_path, derived_path)
+    return derived_path
+
+
+def read_derived_store(derived_path=DERIVED_STORE, countries=None):
+    """
+    저장된 파생 데이터와 그 원본 데이터셋 버전을 반환합니다. 파일이 없으면 (None, None)입니다.
+    """
+    if not os.path.exists(derived_path):
+        return None, None
+    table = feather.read_table(derived_path, memory_map=True)
+    source_version = (table.schema.metadata or {}).get(b'source_version', b'').decode() or None
+    return _filter_countries(table, countries).to_pandas(), source_version
+
+
+def dataset_version(csv_path=TRADE_CSV, store_path=TRADE_STORE):
+    """
+    저장소와 CSV 각각의 경로·수정 시각·크기로 데이터셋 버전 문자열을 만듭니다.
+    둘 중 어느 파일이 바뀌어도 버전이 달라집니다. 파일이 하나도 없으면 None을 반환합니다.
+    """
+    stamps = []
+    for path in (store_path, csv_path):
+        if os.path.exists(path):
+            stat = os.stat(path)
+            stamps.append(f"{os.path.basename(path)}:{stat.st_mtime_ns}:{stat.st_size}")
+    return "|".join(stamps) or None
+
+
+def frame_memory(trade_df) -> int:
+    """데이터프레임이 차지하는 메모리(바이트, 문자열 포함)를 반환합니다."""
+    return int(trade_df.memory_usage(index=True, deep=True).sum())
+
+
+def compact_frame(trade_df, float32=False):
+    """
+    country_name을 category(정수 코드)로 바꾸고 국가·날짜 순으로 정렬된 상태를 보장합니다.
+    float32=True이면 금액·지표 열을 float32로 저장합니다 (유효숫자 약 7자리).
+    """
+    compact = trade_df
+    if not isinstance(compact['country_name'].dtype, pd.CategoricalDtype):
+        compact = compact.assign(country_name=compact['country_name'].astype('category'))
+
+    codes = compact['country_name'].cat.codes.to_numpy()
+    dates = compact['Date'].to_numpy()
+    ordered = np.all((codes[1:] > codes[:-1]) | ((codes[1:] == codes[:-1]) & (dates[1:] > dates[:-1])))
+    if not ordered:
+        compact = compact.sort_values(by=SORT_COLUMNS, kind='stable')
+    compact = compact.reset_index(drop=True)
+
+    if float32:
+        float_cols = compact.select_dtypes(include='float64').columns
+        compact = compact.astype({col: 'float32' for col in float_cols})
+    return compact
+
+
+class TradeDataset:
+    """
+    국가·날짜 순으로 정렬된 무역 데이터와 국가 → 연속 행 구간(start, stop) 색인.
+    국가별 데이터는 불리언 마스크 없이 iloc 구간 슬라이스(복사 없음)로 꺼냅니다.
+    """
+
+    def __init__(self, trade_df, float32=False):
+        self.memory_before = frame_memory(trade_df)
+        self.frame = compact_frame(trade_df, float32)
+        self.memory_after = frame_memory(self.frame)
+
+        countries = self.frame['country_name']
+        codes = countries.cat.codes.to_numpy()
+        bounds = np.searchsorted(codes, np.arange(len(countries.cat.categories) + 1))
+        self.ranges = {
+            name: (int(bounds[i]), int(bounds[i + 1]))
+            for i, name in enumerate(countries.cat.categories) if bounds[i + 1] > bounds[i]
+        }
+        others = sorted(name for name in self.ranges if name != TOTAL_COUNTRY)
+        self.countries = ([TOTAL_COUNTRY] if TOTAL_COUNTRY in self.ranges else []) + others
+
+    def country_frame(self, country):
+        """해당 국가의 행 구간을 반환합니다. 없는 국가이면 빈 데이터프레임입니다."""
+        start, stop = self.ranges.get(country, (0, 0))
+        return self.frame.iloc[start:stop]
+
+
+if __name__ == "__main__":
+    import sys
+    args = sys.argv[1:]
+    print(f"변환 완료: {convert_csv_to_store(*args)}")
@@ -0,0 +1,86 @@
+# view_cache.py
+
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+import trade_store
+
+DEFAULT_MAX_BYTES = 64 * 1024 ** 2
+
+
+def view_columns(is_12m_trailing: bool, show_yoy_growth: bool):
+    """선택된 보기 형태에 해당하는 (수출, 수입, 무역수지) 열 이름을 반환합니다."""
+    trailing = '_trailing_12m' if is_12m_trailing else ''
+    growth = '_yoy_growth' if show_yoy_growth else ''
+    return [f"{col}{trailing}{growth}" for col in trade_store.AMOUNT_COLUMNS]
+
+
+class ViewFrames:
+    """
+    한 보기(국가, 누적 여부, YoY 여부)에 필요한, KOSPI와 병합된 날짜순 정렬 데이터.
+    차트용 melt는 하지 않고 Vega-Lite의 transform_fold에 맡깁니다 (chart_builder 참고).
+    """
+
+    def __init__(self, display_df: pd.DataFrame, columns):
+        self.display_df = display_df
+        self.columns = columns
+        self._dates = display_df['Date'].to_numpy()
+        self.nbytes = int(display_df.memory_usage(deep=True).sum())
+
+    def slice(self, start, end):
+        """
+        [start, end] 기간을 이진 탐색(searchsorted)으로 잘라 반환합니다.
+        전체를 훑는 불리언 마스크 없이 O(log n)으로 경계를 찾습니다.
+        """
+        i = np.searchsorted(self._dates, np.datetime64(pd.Timestamp(start)), side='left')
+        j = np.searchsorted(self._dates, np.datetime64(pd.Timestamp(end)), side='right')
+        return self.display_df.iloc[i:j]
+
+
+def build_view(country_df: pd.DataFrame, kospi_df: pd.DataFrame, is_12m_trailing: bool, show_yoy_growth: bool) -> ViewFrames:
+    """한 국가의 데이터에 대해 보기별 병합·정렬을 미리 수행합니다."""
+    columns = view_columns(is_12m_trailing, show_yoy_growth)
+    keep = ['Date'] + list(dict.fromkeys(trade_store.AMOUNT_COLUMNS + columns))
+    country_df = country_df[keep]
+
+    display_df = pd.merge(country_df, kospi_df, on='Date', how='outer').sort_values(by='Date', kind='stable').reset_index(drop=True)
+    return ViewFrames(display_df, columns)
+
+
+class ViewCache:
+    """
+    (국가, 누적 여부, YoY 여부)별 ViewFrames를 보관하는 LRU 캐시.
+    보관 중인 데이터의 총 크기가 max_bytes를 넘으면 가장 오래 사용하지 않은 보기부터 제거합니다.
+    """
+
+    def __init__(self, dataset: trade_store.TradeDataset, kospi_df: pd.DataFrame, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.dataset = dataset
+        self.kospi_df = kospi_df
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._views = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, country: str, is_12m_trailing: bool, show_yoy_growth: bool) -> ViewFrames:
+        return self.lookup(country, is_12m_trailing, show_yoy_growth)[0]
+
+    def lookup(self, country: str, is_12m_trailing: bool, show_yoy_growth: bool):
+        """(보기 데이터, 캐시 적중 여부)를 반환합니다."""
+        key = (country, bool(is_12m_trailing), bool(show_yoy_growth))
+        with self._lock:
+            view = self._views.get(key)
+            if view is not None:
+                self._views.move_to_end(key)
+                return view, True
+
+        view = build_view(self.dataset.country_frame(country), self.kospi_df, *key[1:])
+        with self._lock:
+            if key not in self._views:
+                self._views[key] = view
+                self.nbytes += view.nbytes
+            self._views.move_to_end(key)
+            while self.nbytes > self.max_bytes and len(self._views) > 1:
+                _, evicted = self._views.popitem(last=False)
+                self.nbytes -= evicted.nbytes
+            return self._views.get(key, view), False